@@ -4,13 +4,16 @@ Ministry of Labour - Fee Strategy & Revenue Optimizer Dashboard
 A comprehensive Streamlit dashboard for analyzing service fees and simulating revenue scenarios.
 """
 import os
+from types import FunctionType
 from dotenv import load_dotenv
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from utils.data_loader import prepare_dashboard_data
+from utils.data_loader import load_dashboard_data, get_data_summary
 from utils.ai_assistant import load_ai_assistant
+from utils.ai_prompts import example_question, fmt_top_services, render_context
 from utils.analytics import (
     calculate_revenue_impact,
     identify_top_opportunities,
@@ -41,9 +44,21 @@ from utils.visualizations import (
     plot_fee_structure_distribution
 )
 
+# Pages read the shared dataframes without defensive copies; Copy-on-Write
+# keeps any later modification local (always on from pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# Optional: downsample large traces before they are sent to the browser
+try:
+    from plotly_resampler import register_plotly_resampler
+    register_plotly_resampler(mode='auto', default_n_shown_samples=2000)
+except ImportError:
+    register_plotly_resampler = None
+
 
 # Page configuration
-st.set_page_config(
+PAGE_CONFIG = dict(
     page_title="Ministry of Labour - Fee Strategy Dashboard",
     page_icon="🏛️",
     layout="wide",
@@ -51,7 +66,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+CUSTOM_CSS = """
     <style>
     .main {
         padding: 0rem 1rem;
@@ -71,13 +86,35 @@ st.markdown("""
         margin-top: 20px;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+# Both are re-sent on every rerun on purpose: Streamlit drops any element a
+# run does not emit, so injecting the style only once would lose it on the
+# next interaction
+st.set_page_config(**PAGE_CONFIG)
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+
+DATA_FILE = "Book1.xlsx"
+YEAR_COLUMNS = [2022, 2023, 2024, 2025]
+
+# Tables keep numeric columns and let the browser add the currency suffix
+FEE_COLUMN = st.column_config.NumberColumn(format="%.0f QAR")
+QAR_COLUMN = st.column_config.NumberColumn(format="%,.0f QAR")
+
+# Rows of the Portfolio service catalog sent to the browser per page
+CATALOG_PAGE_SIZE = 50
 
 
 @st.cache_data
 def load_data():
-    """Load and cache data (original data only)."""
-    return prepare_dashboard_data("Book1.xlsx")
+    """
+    Load and cache data (original data only).
+    
+    Cold starts read the processed data from the Parquet cache in .cache/
+    and only parse the Excel file when the workbook has changed.
+    """
+    return load_dashboard_data(DATA_FILE)
 
 
 @st.cache_resource
@@ -86,10 +123,170 @@ def get_simulator(_df):
     return RevenueSimulator(_df)
 
 
+# Pre-built tiered strategies offered on the Scenario Planning page
+QUICK_STRATEGIES = {
+    "Conservative": {
+        "high_volume_threshold": 50000,
+        "high_volume_fee": 20,
+        "medium_volume_fee": 10,
+        "low_volume_fee": 5
+    },
+    "Moderate": {
+        "high_volume_threshold": 30000,
+        "high_volume_fee": 50,
+        "medium_volume_fee": 20,
+        "low_volume_fee": 10
+    },
+    "Aggressive": {
+        "high_volume_threshold": 20000,
+        "high_volume_fee": 100,
+        "medium_volume_fee": 50,
+        "low_volume_fee": 20
+    }
+}
+
+
+# Row identity plus the columns a scenario can change; the suggestion columns
+# are identical in every scenario, so the cached analytics hash only these
+ANALYTICS_COLUMNS = [
+    'اسم الخدمة', 'Category', 'اجمالي العدد',
+    'Current_Fee_Numeric', 'Current_Annual_Revenue'
+]
+
+
+def hash_services(df):
+    """Fingerprint a services dataframe by the columns the analytics depend on."""
+    return pd.util.hash_pandas_object(df[ANALYTICS_COLUMNS], index=False).to_numpy().tobytes()
+
+
+@st.cache_resource(hash_funcs={pd.DataFrame: hash_services})
+def get_service_arrays(df):
+    """
+    Build a struct-of-arrays view of the services, shared across pages.
+    
+    Args:
+        df: Active services dataframe
+        
+    Returns:
+        dict: Column arrays (history is services x years) plus a name -> row position index
+    """
+    names = df['اسم الخدمة'].to_numpy()
+    return {
+        'requests': df['اجمالي العدد'].to_numpy(),
+        'fees': df['Current_Fee_Numeric'].to_numpy(np.float32),
+        'history': df[YEAR_COLUMNS].to_numpy(np.int32),
+        'name_to_idx': {name: i for i, name in enumerate(names)}
+    }
+
+
+@st.cache_resource(hash_funcs={pd.DataFrame: hash_services})
+def get_services_by_name(df):
+    """Services indexed by name so a single service is a hash lookup, not a full scan."""
+    return df.set_index('اسم الخدمة', drop=False)
+
+
+def top_n_positions(values, n):
+    """
+    Row positions of the n largest values, largest first.
+    
+    Uses np.argpartition so only the selected rows are sorted.
+    
+    Args:
+        values: 1-D numpy array
+        n: Number of positions to return
+        
+    Returns:
+        np.ndarray: Integer row positions
+    """
+    n = min(n, len(values))
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(-values, n - 1)[:n]
+    return top[np.argsort(-values[top], kind='stable')]
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_services})
+def cached_top_opportunities(df, suggested_fee, top_n):
+    """Cached identify_top_opportunities; reruns with the same data are free."""
+    return identify_top_opportunities(df, suggested_fee, top_n)
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_services})
+def cached_category_performance(df):
+    """Cached calculate_category_performance."""
+    return calculate_category_performance(df)
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_services})
+def cached_pareto_analysis(df):
+    """Cached calculate_pareto_analysis."""
+    return calculate_pareto_analysis(df)
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_services})
+def cached_service_quadrant(df):
+    """Cached get_service_quadrant."""
+    return get_service_quadrant(df)
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_services})
+def cached_suggestion_analysis(df):
+    """Cached analyze_suggested_fees, shared by Executive Summary and Quick Wins."""
+    return analyze_suggested_fees(df)
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_services})
+def cached_quick_wins(df, min_requests, top_n):
+    """Cached identify_quick_wins."""
+    return identify_quick_wins(df, min_requests=min_requests, top_n=top_n)
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_services})
+def cached_forecast(df, service_name, years_ahead):
+    """Cached forecast_requests; refits only when the service or data changes."""
+    return forecast_requests(df, service_name, years_ahead=years_ahead)
+
+
+@st.cache_resource(hash_funcs={
+    pd.DataFrame: hash_services,
+    FunctionType: lambda f: f"{f.__module__}.{f.__qualname__}"
+})
+def cached_chart(plot_function, df, *args):
+    """
+    Build a figure from the services dataframe once per dataset and arguments.
+    
+    Figures are kept as shared objects (cache_resource), so reruns and other
+    pages showing the same chart skip both the Plotly construction and a
+    pickle round-trip.
+    
+    Args:
+        plot_function: A utils.visualizations function taking the services dataframe first
+        df: Active services dataframe
+        *args: Extra arguments for plot_function
+        
+    Returns:
+        go.Figure: The figure
+    """
+    return plot_function(df, *args)
+
+
+@st.cache_data
+def cached_scenario_comparison(scenarios_version, _simulator):
+    """
+    Cached compare_scenarios.
+    
+    The simulator itself is not hashed (leading underscore); its version
+    counter changes whenever a scenario is stored, which invalidates the table.
+    """
+    return _simulator.compare_scenarios()
+
+
 def get_active_data(original_df, summary):
     """
     Get the active dataframe (either original or scenario-modified).
     
+    The dataframe is returned without copying; pages must not modify it in place.
+    
     Args:
         original_df: Original dataframe
         summary: Original summary
@@ -99,15 +296,16 @@ def get_active_data(original_df, summary):
     """
     if 'active_scenario' in st.session_state and st.session_state.active_scenario is not None:
         scenario = st.session_state.active_scenario
-        modified_df = scenario['dataframe'].copy()
+        modified_df = scenario['dataframe']
         
-        # Recalculate summary for scenario
-        from utils.data_loader import get_data_summary
-        modified_summary = get_data_summary(modified_df)
+        # Summary is computed once when the scenario is created
+        modified_summary = scenario.get('summary')
+        if modified_summary is None:
+            modified_summary = get_data_summary(modified_df)
         
         return modified_df, modified_summary, True
     
-    return original_df.copy(), summary, False
+    return original_df, summary, False
 
 
 def show_scenario_banner(scenario, original_summary):
@@ -165,6 +363,10 @@ def main():
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
     
+    # Rotates the example question shown in the chat box, per session
+    if 'chat_turns' not in st.session_state:
+        st.session_state.chat_turns = 0
+    
     # Header
     st.title("🏛️ Ministry of Labour - Fee Strategy & Revenue Optimizer")
     st.markdown("**Comprehensive Decision Support System for Service Fee Management**")
@@ -228,19 +430,20 @@ def main():
         
         # Chat input using chat_input (auto-clears after send)
         user_message = st.sidebar.chat_input(
-            "Ask me anything...",
+            example_question(st.session_state.language, st.session_state.chat_turns),
             key="chat_input"
         )
         
         if user_message and user_message.strip():
             # Build context with actual data
-            top_services = df.nlargest(10, 'اجمالي العدد')[['اسم الخدمة', 'اجمالي العدد', 'Current_Fee_Numeric']].to_dict('records')
-            top_services_text = "\n".join([
-                f"- {s['اسم الخدمة']}: {int(s['اجمالي العدد']):,} requests, {s['Current_Fee_Numeric']} QAR fee" 
-                for s in top_services
-            ])
+            top_services = df.nlargest(10, 'اجمالي العدد')[['اسم الخدمة', 'اجمالي العدد', 'Current_Fee_Numeric']]
+            top_services_text = fmt_top_services(
+                top_services.astype({'اجمالي العدد': int})
+                .rename(columns={'اسم الخدمة': 'name', 'اجمالي العدد': 'requests', 'Current_Fee_Numeric': 'fee'})
+                .to_dict('records')
+            )
             
-            context = {
+            context = render_context("dashboard_context", {
                 "page": page if 'page' in locals() else "Dashboard",
                 "total_services": summary['total_services'],
                 "total_requests": summary['total_requests'],
@@ -248,20 +451,21 @@ def main():
                 "current_revenue": summary['current_total_revenue'],
                 "scenario_name": st.session_state.active_scenario['name'] if is_scenario_active else "None",
                 "top_10_services": top_services_text
-            }
+            })
             
-            # Get AI response
-            with st.spinner("🤔 Thinking..."):
-                response = ai.chat(
-                    user_message,
-                    context=context,
-                    language=st.session_state.language,
-                    chat_history=st.session_state.chat_history
-                )
+            # Stream the AI response into the sidebar as it is generated
+            st.sidebar.markdown(f"**You:** {user_message}")
+            response = st.sidebar.write_stream(ai.chat_stream(
+                user_message,
+                context=context,
+                language=st.session_state.language,
+                chat_history=st.session_state.chat_history
+            ))
             
             # Add to history
             st.session_state.chat_history.append({"role": "user", "content": user_message})
             st.session_state.chat_history.append({"role": "assistant", "content": response})
+            st.session_state.chat_turns += 1
             
             # Limit history to last 20 messages
             if len(st.session_state.chat_history) > 20:
@@ -300,6 +504,9 @@ def main():
     if page == "📈 Executive Summary":
         st.header("📈 Executive Summary")
         
+        # Top services by volume, shared by the AI insights and the table below
+        top_10_positions = top_n_positions(get_service_arrays(df)['requests'], 10)
+        
         # KPI Cards
         col1, col2, col3, col4 = st.columns(4)
         
@@ -347,7 +554,7 @@ def main():
             )
         
         # Add Suggestions KPIs
-        suggestions_analysis = analyze_suggested_fees(df)
+        suggestions_analysis = cached_suggestion_analysis(df)
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -404,22 +611,22 @@ def main():
             try:
                 with st.spinner("🤔 Analyzing data..."):
                     # Prepare comprehensive data for insights including ACTUAL suggestions
-                    top_service = df.nlargest(1, 'اجمالي العدد').iloc[0]
+                    top_10 = df.iloc[top_10_positions]
+                    top_service = top_10.iloc[0]
                     
                     # Get top 10 services with their suggestions
-                    top_10 = df.nlargest(10, 'اجمالي العدد')
                     top_10_text = []
-                    for idx, row in top_10.iterrows():
+                    for row in top_10.to_dict('records'):
                         suggestion_info = ""
                         if row['Suggested_Fee_Numeric'] > 0:
-                            suggestion_info = f" | SUGGESTED: {row['Suggested_Fee_Numeric']:.0f} QAR ({row['Fee_Structure_Type']}) - Potential: {row['Revenue_Gap']:,.0f} QAR"
+                            suggestion_info = f" | SUGGESTED: {row['Suggested_Fee_Numeric']:.0f} QAR ({row['Fee_Structure_Type']}) - Potential: {row['Revenue_Gap']:.0f} QAR"
                             if pd.notna(row['ملاحظات و مقترح الرسوم']):
                                 suggestion_info += f' - Note: "{row["ملاحظات و مقترح الرسوم"][:80]}..."'
                         
                         top_10_text.append(
-                            f"{row['اسم الخدمة']}: {int(row['اجمالي العدد']):,} requests, "
+                            f"{row['اسم الخدمة']}: {int(row['اجمالي العدد'])} requests, "
                             f"Current Fee: {row['Current_Fee_Numeric']:.0f} QAR, "
-                            f"Revenue: {row['Current_Annual_Revenue']:,.0f} QAR{suggestion_info}"
+                            f"Revenue: {row['Current_Annual_Revenue']:.0f} QAR{suggestion_info}"
                         )
                     
                     insight_data = {
@@ -485,16 +692,16 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            st.plotly_chart(plot_revenue_trend(df), use_container_width=True)
+            st.plotly_chart(cached_chart(plot_revenue_trend, df), use_container_width=True, key="chart_revenue_trend")
         
         with col2:
-            st.plotly_chart(plot_category_distribution(df), use_container_width=True)
+            st.plotly_chart(cached_chart(plot_category_distribution, df), use_container_width=True, key="chart_category_dist")
         
         # Top services table
         st.subheader("📋 Top 10 Services by Volume")
-        top_10 = df.nlargest(10, 'اجمالي العدد')[
+        top_10 = df.iloc[top_10_positions][
             ['اسم الخدمة', 'Category', 'اجمالي العدد', 'Current_Fee_Numeric', 'Current_Annual_Revenue']
-        ].copy()
+        ]
         top_10.columns = ['Service Name', 'Category', 'Total Requests', 'Current Fee (QAR)', 'Annual Revenue (QAR)']
         st.dataframe(top_10, use_container_width=True, hide_index=True)
     
@@ -520,7 +727,7 @@ def main():
                     index=0
                 )
                 
-                service_data = df[df['اسم الخدمة'] == selected_service].iloc[0]
+                service_data = get_services_by_name(df).loc[selected_service]
                 
                 # Check if service has a suggestion
                 has_suggestion = service_data['Suggested_Fee_Numeric'] > 0
@@ -554,14 +761,28 @@ def main():
                     # Initialize with suggested fee if available
                     default_value = suggested_fee_value if has_suggestion else (int(service_data['Current_Fee_Numeric']) if service_data['Current_Fee_Numeric'] > 0 else 10)
                     
-                    new_fee = st.slider(
-                        "Set New Fee (QAR)",
-                        min_value=0,
-                        max_value=200,
-                        value=default_value,
-                        step=5,
-                        key=f"fee_slider_{selected_service}"
-                    )
+                    # Sliders in a form only rerun the impact analysis on submit,
+                    # not on every step while they are being dragged
+                    with st.form(key=f"single_sim_form_{selected_service}"):
+                        new_fee = st.slider(
+                            "Set New Fee (QAR)",
+                            min_value=0,
+                            max_value=200,
+                            value=default_value,
+                            step=5,
+                            key=f"fee_slider_{selected_service}"
+                        )
+                        
+                        elasticity = st.slider(
+                            "Demand Elasticity (Impact on demand)",
+                            min_value=-1.0,
+                            max_value=0.0,
+                            value=-0.1,
+                            step=0.05,
+                            help="How much demand decreases when fees increase. -0.1 means 10% fee increase = 1% demand decrease"
+                        )
+                        
+                        st.form_submit_button("🔄 Update Impact", use_container_width=True)
                 
                 with col_btn:
                     if has_suggestion:
@@ -570,15 +791,6 @@ def main():
                         if st.button("💡 Use Suggested", key="use_suggested_single"):
                             new_fee = suggested_fee_value
                             st.rerun()
-                
-                elasticity = st.slider(
-                    "Demand Elasticity (Impact on demand)",
-                    min_value=-1.0,
-                    max_value=0.0,
-                    value=-0.1,
-                    step=0.05,
-                    help="How much demand decreases when fees increase. -0.1 means 10% fee increase = 1% demand decrease"
-                )
             
             with col2:
                 st.subheader("📊 Impact Analysis")
@@ -604,21 +816,26 @@ def main():
                     'Requests': [impact['current_requests'], impact['adjusted_requests']]
                 })
                 
-                fig = go.Figure()
-                fig.add_trace(go.Bar(
-                    name='Revenue (QAR)',
-                    x=comparison_data['Scenario'],
-                    y=comparison_data['Revenue'],
-                    marker_color='#667eea'
-                ))
+                # Build the figure once and only swap the bar heights on reruns
+                if 'sim_fig' not in st.session_state:
+                    sim_fig = go.Figure()
+                    sim_fig.add_trace(go.Bar(
+                        name='Revenue (QAR)',
+                        x=comparison_data['Scenario'],
+                        marker_color='#667eea'
+                    ))
+                    
+                    sim_fig.update_layout(
+                        title='Revenue Comparison',
+                        template='plotly_white',
+                        height=300
+                    )
+                    st.session_state.sim_fig = sim_fig
                 
-                fig.update_layout(
-                    title='Revenue Comparison',
-                    template='plotly_white',
-                    height=300
-                )
+                fig = st.session_state.sim_fig
+                fig.data[0].y = comparison_data['Revenue'].to_numpy()
                 
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="chart_sim_revenue")
                 
                 # Apply Scenario Button
                 st.markdown("---")
@@ -638,7 +855,7 @@ def main():
             col1, col2 = st.columns([2, 1])
             
             with col1:
-                categories = df['Category'].unique().tolist()
+                categories = df['Category'].cat.categories.tolist()
                 selected_category = st.selectbox("Select Category", categories)
                 
                 category_services = df[df['Category'] == selected_category]
@@ -701,10 +918,14 @@ def main():
                 
                 fee_changes = {}
                 cols = st.columns(3)
+                service_arrays = get_service_arrays(df)
                 
-                for idx, service in enumerate(selected_services):
+                # Gather every selected service's current fee in one indexed read
+                name_to_idx = service_arrays['name_to_idx']
+                current_fees = service_arrays['fees'][[name_to_idx[s] for s in selected_services]]
+                
+                for idx, (service, current_fee) in enumerate(zip(selected_services, current_fees)):
                     with cols[idx % 3]:
-                        current_fee = df[df['اسم الخدمة'] == service]['Current_Fee_Numeric'].iloc[0]
                         fee = st.number_input(
                             f"{service[:30]}...",
                             min_value=0,
@@ -790,9 +1011,9 @@ def main():
             )
         
         with col2:
-            opportunities = identify_top_opportunities(df, suggested_fee, top_n)
+            opportunities = cached_top_opportunities(df, suggested_fee, top_n)
             
-            st.plotly_chart(plot_opportunities_chart(opportunities), use_container_width=True)
+            st.plotly_chart(plot_opportunities_chart(opportunities), use_container_width=True, key="chart_opps")
         
         # AI Insights for Opportunities - Using ACTUAL documented suggestions
         if ai and ai.is_available():
@@ -801,20 +1022,22 @@ def main():
             try:
                 with st.spinner("🤔 Analyzing opportunities..."):
                     # Get ACTUAL documented suggestions (not generic slider fee)
-                    quick_wins_for_analysis = identify_quick_wins(df, min_requests=10000, top_n=10)
+                    quick_wins_for_analysis = cached_quick_wins(df, 10000, 10)
                     
                     # Prepare detailed opportunities data with ACTUAL suggestions
                     opps_summary = []
-                    for _, row in quick_wins_for_analysis.head(5).iterrows():
-                        suggestion_detail = f"- {row['اسم الخدمة']} (Job Transfer/Permit): {int(row['اجمالي العدد']):,} requests"
-                        suggestion_detail += f"\n  Current Fee: {row['Current_Fee_Numeric']:.0f} QAR"
-                        suggestion_detail += f"\n  DOCUMENTED SUGGESTION: {row['Suggested_Fee_Numeric']:.0f} QAR ({row['Fee_Structure_Type']})"
-                        suggestion_detail += f"\n  Revenue Potential: {row['Revenue_Gap']:,.0f} QAR"
+                    for row in quick_wins_for_analysis.head(5).to_dict('records'):
+                        suggestion_detail = [
+                            f"- {row['اسم الخدمة']} (Job Transfer/Permit): {int(row['اجمالي العدد'])} requests",
+                            f"  Current Fee: {row['Current_Fee_Numeric']:.0f} QAR",
+                            f"  DOCUMENTED SUGGESTION: {row['Suggested_Fee_Numeric']:.0f} QAR ({row['Fee_Structure_Type']})",
+                            f"  Revenue Potential: {row['Revenue_Gap']:.0f} QAR"
+                        ]
                         if pd.notna(row['ملاحظات و مقترح الرسوم']):
-                            suggestion_detail += f'\n  Original Note: "{row["ملاحظات و مقترح الرسوم"][:100]}..."'
+                            suggestion_detail.append(f'  Original Note: "{row["ملاحظات و مقترح الرسوم"][:100]}..."')
                         if row['Special_Conditions']:
-                            suggestion_detail += f"\n  Conditions: {row['Special_Conditions']}"
-                        opps_summary.append(suggestion_detail)
+                            suggestion_detail.append(f"  Conditions: {row['Special_Conditions']}")
+                        opps_summary.append("\n".join(suggestion_detail))
                     
                     insight_data = {
                         "opportunities_data": "\n\n".join(opps_summary) if len(opps_summary) > 0 else "No documented suggestions available in top services.",
@@ -836,16 +1059,20 @@ def main():
         
         st.subheader("📋 Detailed Opportunities")
         
-        display_df = opportunities.copy()
-        display_df.columns = [
+        display_df = opportunities.set_axis([
             'Service Name', 'Total Requests', 'Current Fee', 
             'Revenue Gain', 'Potential Revenue', 'Category'
-        ]
-        display_df['Current Fee'] = display_df['Current Fee'].apply(lambda x: f"{x:.0f} QAR")
-        display_df['Revenue Gain'] = display_df['Revenue Gain'].apply(lambda x: f"{x:,.0f} QAR")
-        display_df['Potential Revenue'] = display_df['Potential Revenue'].apply(lambda x: f"{x:,.0f} QAR")
-        
-        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        ], axis=1)
+        st.dataframe(
+            display_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Current Fee': FEE_COLUMN,
+                'Revenue Gain': QAR_COLUMN,
+                'Potential Revenue': QAR_COLUMN
+            }
+        )
         
         # Summary
         total_potential = opportunities['Revenue_Gain'].sum()
@@ -857,7 +1084,7 @@ def main():
         st.markdown("High-impact opportunities with **documented fee suggestions** from operational data.")
         
         # Get suggestions analysis
-        suggestions_analysis = analyze_suggested_fees(df)
+        suggestions_analysis = cached_suggestion_analysis(df)
         
         # Header KPIs
         col1, col2, col3, col4 = st.columns(4)
@@ -934,10 +1161,10 @@ def main():
         
         with col2:
             # Get quick wins
-            quick_wins = identify_quick_wins(df, min_requests=min_volume, top_n=top_quick_wins_n)
+            quick_wins = cached_quick_wins(df, min_volume, top_quick_wins_n)
             
             if len(quick_wins) > 0:
-                st.plotly_chart(plot_revenue_gap_waterfall(df[df['Suggested_Fee_Numeric'] > 0], top_quick_wins_n), use_container_width=True)
+                st.plotly_chart(plot_revenue_gap_waterfall(df[df['Suggested_Fee_Numeric'] > 0], top_quick_wins_n), use_container_width=True, key="chart_quick_wins_waterfall")
             else:
                 st.info("No quick wins found with current filters. Try lowering the minimum volume threshold.")
         
@@ -997,14 +1224,14 @@ def main():
         with col1:
             # Current vs Suggested Fees comparison
             if len(quick_wins) > 0:
-                st.plotly_chart(plot_current_vs_suggested_fees(df, top_n=10), use_container_width=True)
+                st.plotly_chart(cached_chart(plot_current_vs_suggested_fees, df, 10), use_container_width=True, key="chart_current_vs_suggested")
             else:
                 st.info("Add more services with suggestions to see comparison.")
         
         with col2:
             # Fee structure distribution
             if suggestions_analysis['total_services_with_suggestions'] > 0:
-                st.plotly_chart(plot_fee_structure_distribution(df), use_container_width=True)
+                st.plotly_chart(cached_chart(plot_fee_structure_distribution, df), use_container_width=True, key="chart_fee_structure")
             else:
                 st.info("No fee structure data available.")
         
@@ -1076,12 +1303,11 @@ def main():
                 'اسم الخدمة', 'Category', 'اجمالي العدد', 
                 'Current_Fee_Numeric', 'Suggested_Fee_Numeric', 
                 'Revenue_Gap', 'Fee_Structure_Type', 'ملاحظات و مقترح الرسوم'
-            ]].copy()
-            export_df.columns = [
+            ]].set_axis([
                 'Service', 'Category', 'Total Requests',
                 'Current Fee', 'Suggested Fee', 
                 'Revenue Gain', 'Fee Type', 'Notes'
-            ]
+            ], axis=1)
             
             st.download_button(
                 label="📥 Download Quick Wins Report (Excel)",
@@ -1097,28 +1323,30 @@ def main():
         
         # Overall trends
         st.subheader("📈 Overall Request Trends")
-        st.plotly_chart(plot_revenue_trend(df), use_container_width=True)
+        st.plotly_chart(cached_chart(plot_revenue_trend, df), use_container_width=True, key="chart_trend_analysis")
         
         # Category performance
         st.subheader("📊 Performance by Category")
-        category_perf = calculate_category_performance(df)
+        category_perf = cached_category_performance(df)
         
-        display_perf = category_perf.copy()
-        display_perf.columns = [
+        display_perf = category_perf.set_axis([
             'Category', 'Service Count', 'Total Requests', 'Total Revenue',
             'Avg Requests/Service', 'Services with Fees', 'Fee Coverage %'
-        ]
-        display_perf['Total Revenue'] = display_perf['Total Revenue'].apply(lambda x: f"{x:,.0f} QAR")
-        
-        st.dataframe(display_perf, use_container_width=True, hide_index=True)
+        ], axis=1)
+        st.dataframe(
+            display_perf,
+            use_container_width=True,
+            hide_index=True,
+            column_config={'Total Revenue': QAR_COLUMN}
+        )
         
         col1, col2 = st.columns(2)
         
         with col1:
-            st.plotly_chart(plot_top_services(df, 15), use_container_width=True)
+            st.plotly_chart(cached_chart(plot_top_services, df, 15), use_container_width=True, key="chart_top_services")
         
         with col2:
-            st.plotly_chart(plot_fee_status(df), use_container_width=True)
+            st.plotly_chart(cached_chart(plot_fee_status, df), use_container_width=True, key="chart_fee_status")
         
         # Individual service forecast
         st.subheader("🔮 Service Forecast")
@@ -1129,18 +1357,13 @@ def main():
             key="forecast_service"
         )
         
-        service_data = df[df['اسم الخدمة'] == selected_service_forecast].iloc[0]
+        service_arrays = get_service_arrays(df)
+        history = service_arrays['history'][service_arrays['name_to_idx'][selected_service_forecast]]
+        historical = dict(zip(map(str, YEAR_COLUMNS), history.tolist()))
         
-        historical = {
-            '2022': int(service_data[2022]),
-            '2023': int(service_data[2023]),
-            '2024': int(service_data[2024]),
-            '2025': int(service_data[2025])
-        }
-        
-        forecast = forecast_requests(df, selected_service_forecast, years_ahead=2)
+        forecast = cached_forecast(df, selected_service_forecast, 2)
         
-        st.plotly_chart(plot_forecast(historical, forecast), use_container_width=True)
+        st.plotly_chart(plot_forecast(historical, forecast), use_container_width=True, key="chart_forecast")
         
         col1, col2 = st.columns(2)
         with col1:
@@ -1154,8 +1377,8 @@ def main():
         
         # Pareto Analysis
         st.subheader("📉 Pareto Analysis (80/20 Rule)")
-        pareto_df = calculate_pareto_analysis(df)
-        st.plotly_chart(plot_pareto_chart(pareto_df), use_container_width=True)
+        pareto_df = cached_pareto_analysis(df)
+        st.plotly_chart(plot_pareto_chart(pareto_df), use_container_width=True, key="chart_pareto")
         
         # Find 80% threshold
         services_for_80 = len(pareto_df[pareto_df['Cumulative_Pct'] <= 80])
@@ -1169,15 +1392,24 @@ def main():
         
         # Quadrant Analysis
         st.subheader("📊 Portfolio Quadrant Analysis")
-        df_quadrant = get_service_quadrant(df)
-        st.plotly_chart(plot_quadrant_analysis(df_quadrant), use_container_width=True)
+        df_quadrant = cached_service_quadrant(df)
+        st.plotly_chart(plot_quadrant_analysis(df_quadrant), use_container_width=True, key="chart_quadrant")
         
         # Quadrant summary
-        quadrant_summary = df_quadrant.groupby('Quadrant').agg({
-            'اسم الخدمة': 'count',
-            'اجمالي العدد': 'sum',
-            'Current_Annual_Revenue': 'sum'
-        }).reset_index()
+        # Quadrant summary: one bincount pass per column over the quadrant codes
+        quadrants = pd.Categorical(df_quadrant['Quadrant'])
+        codes = quadrants.codes.astype(np.intp)
+        num_quadrants = len(quadrants.categories)
+        quadrant_summary = pd.DataFrame({
+            'Quadrant': quadrants.categories,
+            'اسم الخدمة': np.bincount(codes, minlength=num_quadrants),
+            'اجمالي العدد': np.bincount(
+                codes, weights=df_quadrant['اجمالي العدد'].to_numpy(), minlength=num_quadrants
+            ),
+            'Current_Annual_Revenue': np.bincount(
+                codes, weights=df_quadrant['Current_Annual_Revenue'].to_numpy(), minlength=num_quadrants
+            )
+        })
         
         st.subheader("📋 Quadrant Summary")
         
@@ -1206,43 +1438,26 @@ def main():
         # Pre-built scenarios
         st.subheader("🎯 Quick Scenarios")
         
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if st.button("💼 Conservative Strategy", use_container_width=True):
-                scenario = simulator.apply_tiered_fee_strategy(
-                    "Conservative",
-                    high_volume_threshold=50000,
-                    high_volume_fee=20,
-                    medium_volume_fee=10,
-                    low_volume_fee=5
-                )
-                st.session_state['last_scenario'] = scenario
-                st.rerun()
+        # Tier assignments for all three strategies come from one vectorized pass
+        if 'quick_strategy_fees' not in st.session_state:
+            st.session_state.quick_strategy_fees = simulator.compute_tiered_fees(QUICK_STRATEGIES)
         
-        with col2:
-            if st.button("⚡ Moderate Strategy", use_container_width=True):
-                scenario = simulator.apply_tiered_fee_strategy(
-                    "Moderate",
-                    high_volume_threshold=30000,
-                    high_volume_fee=50,
-                    medium_volume_fee=20,
-                    low_volume_fee=10
-                )
-                st.session_state['last_scenario'] = scenario
-                st.rerun()
+        quick_buttons = [
+            ("💼 Conservative Strategy", "Conservative"),
+            ("⚡ Moderate Strategy", "Moderate"),
+            ("🚀 Aggressive Strategy", "Aggressive")
+        ]
         
-        with col3:
-            if st.button("🚀 Aggressive Strategy", use_container_width=True):
-                scenario = simulator.apply_tiered_fee_strategy(
-                    "Aggressive",
-                    high_volume_threshold=20000,
-                    high_volume_fee=100,
-                    medium_volume_fee=50,
-                    low_volume_fee=20
-                )
-                st.session_state['last_scenario'] = scenario
-                st.rerun()
+        for col, (label, strategy) in zip(st.columns(3), quick_buttons):
+            with col:
+                if st.button(label, use_container_width=True):
+                    scenario = simulator.apply_tiered_fee_strategy(
+                        strategy,
+                        **QUICK_STRATEGIES[strategy],
+                        fee_changes=st.session_state.quick_strategy_fees[strategy]
+                    )
+                    st.session_state['last_scenario'] = scenario
+                    st.rerun()
         
         # Target revenue optimizer
         st.markdown("---")
@@ -1327,24 +1542,34 @@ def main():
                 
                 services_df = pd.DataFrame(scenario['services_modified'])
                 services_df.columns = ['Service', 'Original Fee', 'New Fee', 'Requests', 'Revenue Change']
-                services_df['Original Fee'] = services_df['Original Fee'].apply(lambda x: f"{x:.0f} QAR")
-                services_df['New Fee'] = services_df['New Fee'].apply(lambda x: f"{x:.0f} QAR")
-                services_df['Revenue Change'] = services_df['Revenue Change'].apply(lambda x: f"{x:,.0f} QAR")
-                
-                st.dataframe(services_df, use_container_width=True, hide_index=True)
+                st.dataframe(
+                    services_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        'Original Fee': FEE_COLUMN,
+                        'New Fee': FEE_COLUMN,
+                        'Revenue Change': QAR_COLUMN
+                    }
+                )
         
         # Compare all scenarios
         if simulator.scenarios:
             st.markdown("---")
             st.subheader("📊 Scenario Comparison")
             
-            comparison_df = simulator.compare_scenarios()
+            comparison_df = cached_scenario_comparison(simulator.version, simulator)
             
-            comparison_df['Total Revenue'] = comparison_df['Total Revenue'].apply(lambda x: f"{x:,.0f} QAR")
-            comparison_df['Revenue Increase'] = comparison_df['Revenue Increase'].apply(lambda x: f"{x:,.0f} QAR")
-            comparison_df['Increase %'] = comparison_df['Increase %'].apply(lambda x: f"{x:.1f}%")
-            
-            st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+            st.dataframe(
+                comparison_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'Total Revenue': QAR_COLUMN,
+                    'Revenue Increase': QAR_COLUMN,
+                    'Increase %': st.column_config.NumberColumn(format="%.1f%%")
+                }
+            )
     
     # === PORTFOLIO ANALYSIS ===
     elif page == "📉 Portfolio Analysis":
@@ -1355,22 +1580,17 @@ def main():
         
         with col1:
             st.subheader("📊 Service Distribution")
-            st.plotly_chart(plot_category_distribution(df), use_container_width=True)
+            st.plotly_chart(cached_chart(plot_category_distribution, df), use_container_width=True, key="chart_portfolio_category_dist")
         
         with col2:
             st.subheader("💰 Fee Status")
-            st.plotly_chart(plot_fee_status(df), use_container_width=True)
+            st.plotly_chart(cached_chart(plot_fee_status, df), use_container_width=True, key="chart_portfolio_fee_status")
         
         with col3:
             st.subheader("📈 Growth Metrics")
-            growth_2024 = ((df[2024].sum() - df[2023].sum()) / df[2023].sum() * 100)
-            st.metric("YoY Growth (2023-2024)", f"{growth_2024:.1f}%")
-            
-            avg_growth = df[df['Growth_Rate_2023_2024'] != 0]['Growth_Rate_2023_2024'].mean()
-            st.metric("Avg Service Growth", f"{avg_growth:.1f}%")
-            
-            services_growing = (df['Growth_Rate_2023_2024'] > 0).sum()
-            st.metric("Growing Services", f"{services_growing}/{len(df)}")
+            st.metric("YoY Growth (2023-2024)", f"{summary['growth_2024']:.1f}%")
+            st.metric("Avg Service Growth", f"{summary['avg_growth']:.1f}%")
+            st.metric("Growing Services", f"{summary['services_growing']}/{len(df)}")
         
         # Full data table with filters
         st.subheader("📋 Complete Service Catalog")
@@ -1380,7 +1600,7 @@ def main():
         with col1:
             filter_category = st.multiselect(
                 "Filter by Category",
-                options=['All'] + df['Category'].unique().tolist(),
+                options=['All'] + df['Category'].cat.categories.tolist(),
                 default=['All']
             )
         
@@ -1398,18 +1618,24 @@ def main():
                 step=100
             )
         
-        # Apply filters
-        filtered_df = df.copy()
+        # Apply filters as one boolean mask so the frame is indexed only once
+        mask = df['اجمالي العدد'].to_numpy() >= min_requests
         
         if 'All' not in filter_category:
-            filtered_df = filtered_df[filtered_df['Category'].isin(filter_category)]
+            # Compare the categorical's integer codes rather than the labels;
+            # a single category is a plain equality test
+            category = df['Category'].cat
+            codes = category.codes.to_numpy()
+            selected_codes = category.categories.get_indexer(filter_category)
+            if len(selected_codes) == 1:
+                mask &= codes == selected_codes[0]
+            else:
+                mask &= np.isin(codes, selected_codes)
         
-        if filter_fee_status == 'With Fees':
-            filtered_df = filtered_df[filtered_df['Has_Current_Fee'] == True]
-        elif filter_fee_status == 'Without Fees':
-            filtered_df = filtered_df[filtered_df['Has_Current_Fee'] == False]
+        if filter_fee_status != 'All':
+            mask &= df['Has_Current_Fee'].to_numpy() == (filter_fee_status == 'With Fees')
         
-        filtered_df = filtered_df[filtered_df['اجمالي العدد'] >= min_requests]
+        filtered_df = df[mask]
         
         # Display table
         display_cols = [
@@ -1417,22 +1643,36 @@ def main():
             'اجمالي العدد', 'Current_Fee_Numeric', 'Current_Annual_Revenue'
         ]
         
-        display_table = filtered_df[display_cols].copy()
-        display_table.columns = [
+        # Send the browser one page of rows at a time; "Load more" adds pages.
+        # The count is kept per filter selection, so new filters start at one page
+        catalog_filters = (tuple(filter_category), filter_fee_status, min_requests)
+        if st.session_state.get('catalog_filters') != catalog_filters:
+            st.session_state.catalog_filters = catalog_filters
+            st.session_state.catalog_rows = CATALOG_PAGE_SIZE
+        rows_shown = st.session_state.catalog_rows
+        
+        display_table = filtered_df[display_cols].head(rows_shown).set_axis([
             'Service Name', 'Category', '2022', '2023', '2024', '2025',
             'Total', 'Fee (QAR)', 'Revenue (QAR)'
-        ]
+        ], axis=1)
         
         st.dataframe(
-            display_table.style.format({
-                'Fee (QAR)': '{:.0f}',
-                'Revenue (QAR)': '{:,.0f}'
-            }),
+            display_table,
             use_container_width=True,
             hide_index=True,
-            height=400
+            height=400,
+            column_config={
+                'Fee (QAR)': st.column_config.NumberColumn(format="%.0f"),
+                'Revenue (QAR)': st.column_config.NumberColumn(format="%,.0f")
+            }
         )
         
+        if len(filtered_df) > rows_shown:
+            st.caption(f"Displaying the first {rows_shown} of {len(filtered_df)} matching services")
+            if st.button("⬇️ Load more", key="catalog_load_more"):
+                st.session_state.catalog_rows = rows_shown + CATALOG_PAGE_SIZE
+                st.rerun()
+        
         st.info(f"Showing {len(filtered_df)} of {len(df)} services")
     
     # Footer
@@ -1,59 +1,303 @@
 """Find the latest Claude models available"""
+# anthropic and dotenv are imported inside the functions that use them so
+# that --help and cached runs start without loading the SDK
+import argparse
+import asyncio
+import importlib.util
+import json
 import os
+import random
+import re
 import sys
-from dotenv import load_dotenv
-from anthropic import Anthropic
-
-sys.stdout.reconfigure(encoding='utf-8')
-load_dotenv()
-
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-
-# Try latest model naming patterns
-latest_models = [
-    "claude-sonnet-4-20250514",
-    "claude-4-sonnet-latest",
-    "claude-4-opus-latest", 
-    "claude-sonnet-4.0-20250514",
-    "claude-opus-4-20250514",
-    "claude-3-7-sonnet-20250219",
-    "claude-3-opus-20240229",
-    "claude-3-haiku-20240307",
-    "claude-sonnet-3-5-20241022",
-    "anthropic.claude-sonnet-4-v1",
-]
-
-print("Finding Latest Claude Models...")
-print("=" * 60)
-
-working_models = []
-
-for model in latest_models:
+import time
+from pathlib import Path
+
+_SEP = "=" * 60
+
+# Candidate models as (priority, model id); lower priority wins and names
+# sharing a priority are aliases of the same model
+CANDIDATES = sorted([
+    (0, "claude-sonnet-4-20250514"),
+    (0, "claude-4-sonnet-latest"),
+    (0, "claude-sonnet-4.0-20250514"),
+    (0, "anthropic.claude-sonnet-4-v1"),
+    (1, "claude-4-opus-latest"),
+    (1, "claude-opus-4-20250514"),
+    (2, "claude-3-7-sonnet-20250219"),
+    (3, "claude-3-opus-20240229"),
+    (4, "claude-sonnet-3-5-20241022"),
+    (5, "claude-3-haiku-20240307"),
+])
+
+# Anthropic model ids look like "claude-<family>-<version>[-<date>]"
+MODEL_ID_PATTERN = re.compile(r"^claude-[a-z0-9]+(?:[-.][a-z0-9]+)*$")
+
+# The model catalog rarely changes, so a discovered model is reused for a day
+CACHE_PATH = Path.home() / ".cache" / "albarami" / "best_model.json"
+CACHE_TTL = 24 * 60 * 60
+
+# Smallest request that still tells a working model from a missing one
+PING_MESSAGES = [{"role": "user", "content": "."}]
+PING_MAX_TOKENS = 1
+
+# Transient failures (throttling, dropped connections, timeouts) are retried
+# with jittered exponential backoff: ~0.5s, ~1s between the three attempts
+PROBE_RETRIES = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_JITTER = 0.25
+
+
+def load_cached_model(max_age=CACHE_TTL):
+    """Return the cached best model, or None if missing or older than max_age seconds."""
     try:
-        message = client.messages.create(
-            model=model,
-            max_tokens=10,
-            messages=[{"role": "user", "content": "Hi"}]
+        if time.time() - CACHE_PATH.stat().st_mtime >= max_age:
+            return None
+        return json.loads(CACHE_PATH.read_text(encoding="utf-8"))["best_model"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached_model(model, out=print):
+    """Persist the best model so the next run can skip probing."""
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_PATH.write_text(
+            json.dumps({"best_model": model, "ts": time.time()}),
+            encoding="utf-8"
         )
-        result = message.content[0].text
-        print(f"WORKS: {model}")
-        print(f"  --> {result}")
-        working_models.append(model)
-    except Exception as e:
-        error_str = str(e).lower()
-        if "not_found" in error_str or "invalid" in error_str:
-            print(f"Not available: {model}")
+    except OSError as e:
+        out(f"Could not write cache {CACHE_PATH}: {e}")
+
+
+def clean_candidates(candidates):
+    """
+    Drop duplicate and malformed model ids so each name costs at most one request.
+
+    Args:
+        candidates: Sorted (priority, model) tuples; a repeated model keeps
+            its best priority.
+
+    Returns:
+        tuple: (candidates, rejected_models) - both keep priority order.
+    """
+    unique = {}
+    for priority, model in candidates:
+        unique.setdefault(model, priority)
+    valid = [(p, m) for m, p in unique.items() if MODEL_ID_PATTERN.match(m)]
+    rejected = [m for m in unique if not MODEL_ID_PATTERN.match(m)]
+    return valid, rejected
+
+
+def make_http_client():
+    """
+    Shared keep-alive connection pool so every request reuses one TLS session.
+
+    Returns:
+        DefaultAsyncHttpxClient, or None on SDKs that predate it (the
+        client then builds its own pool, which is also shared by probes).
+    """
+    try:
+        from anthropic import DefaultAsyncHttpxClient
+    except ImportError:
+        return None
+
+    # HTTP/2 needs the optional h2 package
+    return DefaultAsyncHttpxClient(http2=importlib.util.find_spec("h2") is not None)
+
+
+async def probe(client, model):
+    """
+    Send a minimal request to a single model.
+
+    Transient errors are retried with jittered exponential backoff so
+    that throttling or a dropped connection is not mistaken for a
+    missing model.
+
+    Returns:
+        tuple: (model, response_text, error) - error is None on success.
+    """
+    from anthropic import APIConnectionError, RateLimitError
+
+    for attempt in range(PROBE_RETRIES):
+        try:
+            message = await client.messages.create(
+                model=model,
+                max_tokens=PING_MAX_TOKENS,
+                messages=PING_MESSAGES
+            )
+            text = message.content[0].text if message.content else ""
+            return model, text, None
+        except (RateLimitError, APIConnectionError) as e:
+            if attempt == PROBE_RETRIES - 1:
+                return model, None, e
+            await asyncio.sleep(RETRY_BASE_DELAY * 2 ** attempt + random.random() * RETRY_JITTER)
+        except Exception as e:
+            return model, None, e
+
+
+async def list_available(client):
+    """Fetch the ids of every model in the account's catalog with a single listing."""
+    return {model.id async for model in client.models.list(limit=1000)}
+
+
+def match_catalog(candidates, available, stop_at_first=True):
+    """
+    Check candidate models against the catalog without any inference calls.
+
+    Returns:
+        tuple: (results, skipped_models) in the same shape as the probes.
+    """
+    results = []
+    for _, model in candidates:
+        if model in available:
+            results.append((model, "listed in model catalog", None))
+            if stop_at_first:
+                break
         else:
-            print(f"ERROR {model}: {str(e)[:60]}")
-
-print("\n" + "=" * 60)
-if working_models:
-    print(f"WORKING MODELS FOUND: {len(working_models)}")
-    for m in working_models:
-        print(f"  - {m}")
-    print(f"\nBest to use: {working_models[0]}")
-else:
-    print("No working models found!")
-    print("Using OpenRouter or OpenAI instead")
-print("=" * 60)
+            results.append((model, None, LookupError("not_found: not in model catalog")))
+    return results, [model for _, model in candidates[len(results):]]
+
+
+async def probe_all(candidates, stop_at_first=True):
+    """
+    Find working models, preferring one catalog listing over trial requests.
+
+    Older SDKs without `models.list` (or endpoints that refuse it) fall
+    back to probing all candidates concurrently.
+
+    With stop_at_first, as soon as a model works every probe with a worse
+    priority is cancelled; probes that could still beat it keep running.
+
+    Args:
+        candidates: (priority, model) tuples sorted by priority.
+
+    Returns:
+        tuple: (results, skipped_models) - results keep candidate order.
+    """
+    from anthropic import APIConnectionError, APIStatusError, AsyncAnthropic
+
+    async with AsyncAnthropic(
+        api_key=os.getenv("ANTHROPIC_API_KEY"),
+        http_client=make_http_client(),
+        max_retries=0  # probe() owns the retry policy
+    ) as client:
+        try:
+            available = await list_available(client)
+            return match_catalog(candidates, available, stop_at_first)
+        except APIConnectionError as e:
+            return [(model, None, e) for _, model in candidates], []
+        except (AttributeError, APIStatusError):
+            pass
+
+        tasks = {
+            asyncio.create_task(probe(client, model)): priority
+            for priority, model in candidates
+        }
+        pending = set(tasks)
+        best_priority = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.result()[2] is None and (best_priority is None or tasks[task] < best_priority):
+                    best_priority = tasks[task]
+
+            if stop_at_first and best_priority is not None:
+                outranked = {task for task in pending if tasks[task] > best_priority}
+                for task in outranked:
+                    task.cancel()
+                pending -= outranked
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = [task.result() for task in tasks if not task.cancelled()]
+        skipped = [model for task, (_, model) in zip(tasks, candidates) if task.cancelled()]
+        return results, skipped
+
+
+def report(args, out):
+    """Resolve the best model, passing each output line to `out`."""
+    out("Finding Latest Claude Models...")
+    out(_SEP)
+
+    if not (args.refresh or args.all):
+        cached_model = load_cached_model()
+        if cached_model:
+            out(f"Best to use: {cached_model} (cached in {CACHE_PATH})")
+            out("Run with --refresh to probe again")
+            out(_SEP)
+            return
+
+    from dotenv import load_dotenv
+    from anthropic import APIConnectionError, BadRequestError, NotFoundError
+
+    load_dotenv()
+
+    candidates, rejected = clean_candidates(CANDIDATES)
+    for model in rejected:
+        out(f"Invalid model id: {model}")
+
+    results, skipped = asyncio.run(probe_all(candidates, stop_at_first=not args.all))
+    # results keep candidate order, so the first success is the preferred model
+    best_model = next((model for model, _, error in results if error is None), None)
+
+    for model, result, error in results:
+        if error is None:
+            out(f"WORKS: {model}")
+            out(f"  --> {result}")
+        elif isinstance(error, (NotFoundError, BadRequestError, LookupError)):
+            out(f"Not available: {model}")
+        elif isinstance(error, APIConnectionError):
+            out(f"Net error {model}: {str(error)[:60]}")
+        else:
+            out(f"ERROR {model}: {str(error)[:60]}")
+
+    for model in skipped:
+        out(f"Skipped: {model}")
+
+    out(f"\n{_SEP}")
+    if best_model is not None:
+        working_models = [model for model, _, error in results if error is None]
+        out(f"WORKING MODELS FOUND: {len(working_models)}")
+        for m in working_models:
+            out(f"  - {m}")
+        out(f"\nBest to use: {best_model}")
+        save_cached_model(best_model, out)
+    else:
+        stale_model = load_cached_model(max_age=float("inf"))
+        network_down = all(isinstance(error, APIConnectionError) for _, _, error in results)
+        if stale_model and network_down:
+            out(f"Network unavailable - falling back to cached model: {stale_model}")
+        else:
+            out("No working models found!")
+            out("Using OpenRouter or OpenAI instead")
+    out(_SEP)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="probe every model instead of stopping at the first working one"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="ignore the cached result and probe again"
+    )
+    args = parser.parse_args()
+
+    if (sys.stdout.encoding or "").lower() != "utf-8":
+        sys.stdout.reconfigure(encoding='utf-8')
+
+    # Collect the report and write it in one call instead of one per line
+    lines = []
+    try:
+        report(args, lines.append)
+    finally:
+        sys.stdout.write("\n".join(lines) + "\n")
+
 
+if __name__ == "__main__":
+    main()
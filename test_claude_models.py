@@ -1,13 +1,7 @@
 """Test different Claude model names"""
-import os
 import sys
-from dotenv import load_dotenv
-from anthropic import Anthropic
-
-sys.stdout.reconfigure(encoding='utf-8')
-load_dotenv()
-
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+from concurrent.futures import ThreadPoolExecutor
+from utils.clients import get_anthropic_client
 
 # List of model names to try
 models_to_try = [
@@ -20,25 +14,50 @@ models_to_try = [
     "claude-3-opus-latest",
 ]
 
-print("Testing Claude Models...")
-print("=" * 60)
 
-for model in models_to_try:
+def probe(client, model):
+    """
+    Send a tiny request to one model.
+
+    Returns:
+        tuple: (model, response_text, error) - error is None on success.
+    """
     try:
         message = client.messages.create(
             model=model,
             max_tokens=5,
             messages=[{"role": "user", "content": "Hi"}]
         )
-        print(f"SUCCESS: {model}")
-        print(f"  Response: {message.content[0].text}")
-        break  # Stop at first working model
+        return model, message.content[0].text, None
     except Exception as e:
-        error_msg = str(e)
+        return model, None, e
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    client = get_anthropic_client()
+
+    print("Testing Claude Models...")
+    print("=" * 60)
+
+    # The requests are network-bound, so they all run at once; results
+    # come back in list order and are reported up to the first success
+    with ThreadPoolExecutor(max_workers=len(models_to_try)) as executor:
+        results = list(executor.map(lambda model: probe(client, model), models_to_try))
+
+    for model, text, error in results:
+        if error is None:
+            print(f"SUCCESS: {model}")
+            print(f"  Response: {text}")
+            break  # Stop at first working model
+        error_msg = str(error)
         if "not_found" in error_msg.lower():
             print(f"NOT FOUND: {model}")
         else:
             print(f"ERROR: {model} - {error_msg[:50]}")
 
-print("=" * 60)
+    print("=" * 60)
+
 
+if __name__ == "__main__":
+    main()
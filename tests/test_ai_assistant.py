@@ -0,0 +1,57 @@
+"""
+Tests for response cache keys in utils/ai_assistant.py.
+"""
+import pytest
+from utils.ai_assistant import AIAssistant
+
+
+@pytest.fixture
+def assistant():
+    """Assistant without API keys; cache keys need no clients."""
+    return AIAssistant()
+
+
+class TestCacheKeys:
+    """Test that cache keys cover everything that decides the answer."""
+    
+    def test_language_changes_insight_key(self, assistant):
+        """Test that the same insight prompt is cached per language."""
+        prompt = "Analyze this portfolio"
+        
+        assert (
+            assistant._get_cache_key(prompt, "executive_summary", "en")
+            != assistant._get_cache_key(prompt, "executive_summary", "ar")
+        )
+    
+    def test_history_changes_chat_key(self, assistant):
+        """Test that a follow-up question is cached per conversation."""
+        first = assistant._build_chat_messages("why?", None, "en", [
+            {"role": "user", "content": "Which service earns most?"},
+            {"role": "assistant", "content": "Work permits."}
+        ])
+        second = assistant._build_chat_messages("why?", None, "en", [
+            {"role": "user", "content": "Which fee should we cut?"},
+            {"role": "assistant", "content": "Visa renewals."}
+        ])
+        
+        assert (
+            assistant._get_cache_key("gpt-4o-mini", first, "en")
+            != assistant._get_cache_key("gpt-4o-mini", second, "en")
+        )
+    
+    def test_language_changes_chat_key(self, assistant):
+        """Test that the same chat message is cached per language."""
+        english = assistant._build_chat_messages("Hello", None, "en")
+        arabic = assistant._build_chat_messages("Hello", None, "ar")
+        
+        assert (
+            assistant._get_cache_key("gpt-4o-mini", english, "en")
+            != assistant._get_cache_key("gpt-4o-mini", arabic, "ar")
+        )
+    
+    def test_context_key_order_does_not_matter(self, assistant):
+        """Test that contexts differing only in key order share a key."""
+        assert (
+            assistant._get_cache_key("prompt", {"a": 1, "b": 2})
+            == assistant._get_cache_key("prompt", {"b": 2, "a": 1})
+        )
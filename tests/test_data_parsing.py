@@ -5,6 +5,7 @@ import pytest
 import pandas as pd
 from utils.data_loader import (
     parse_suggested_fee,
+    parse_suggested_fees,
     extract_historical_fee_changes,
     identify_special_conditions
 )
@@ -75,6 +76,42 @@ class TestParseSuggestedFee:
         assert result['unit_type'] == 'flat'
 
 
+class TestParseSuggestedFees:
+    """Test parse_suggested_fees (vectorized parse_suggested_fee)."""
+    
+    NOTES = [
+        "عشرة ريال عن كل شخص",
+        "مئة ريال عن كل شهر",
+        "عشرون ريال لكل تعديل",
+        "خمسة ريال لكل مهنة تخصصية , اثنين ريال لكل مهنة غير تخصصية",
+        "مئة ريال في حال الجهة الجديدة شركة خاصة",
+        "ستون ريال في حال الفصل التأديبي",
+        "الخدمة لجهات حكومية في حال الطلب",
+        "100",
+        "20000",
+        "خدمة جديدة بدون رسوم",
+        "",
+        None
+    ]
+    
+    def test_matches_row_by_row_parsing(self):
+        """Test every column matches parse_suggested_fee for each note."""
+        result = parse_suggested_fees(pd.Series(self.NOTES))
+        
+        for i, text in enumerate(self.NOTES):
+            expected = parse_suggested_fee(text)
+            for key in ['base_fee', 'unit_type', 'secondary_fee', 'conditions', 'confidence']:
+                assert result.loc[i, key] == expected[key], (text, key)
+    
+    def test_keeps_index(self):
+        """Test the result is aligned with the input index."""
+        notes = pd.Series(["عشرة ريال عن كل شخص", None], index=[5, 9])
+        result = parse_suggested_fees(notes)
+        
+        assert list(result.index) == [5, 9]
+        assert result.loc[9, 'unit_type'] == 'none'
+
+
 class TestExtractHistoricalFeeChanges:
     """Test extract_historical_fee_changes function."""
     
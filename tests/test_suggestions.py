@@ -31,7 +31,11 @@ def sample_df():
         'Suggested_Revenue_Potential': [5000000, 1500000, 300000, 0, 50000],
         'Revenue_Gap': [5000000, 1200000, 300000, 0, 50000],
         'Has_Historical_Change': [False, True, False, False, False],
-        'Special_Conditions': ['', '', '', '', 'For private companies']
+        'Special_Conditions': ['', '', '', '', 'For private companies'],
+        'ملاحظات و مقترح الرسوم': [
+            'مئة ريال عن كل شخص', 'خمسون ريال', 'عشرون ريال عن كل شهر',
+            None, 'عشرة ريال في حال الجهة الجديدة شركة خاصة'
+        ]
     }
     
     return pd.DataFrame(data)
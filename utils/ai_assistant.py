@@ -3,29 +3,258 @@ AI Assistant module for Ministry of Labour Dashboard.
 Handles chat, insights generation, reports, and scenario building using OpenAI and Anthropic.
 """
 import os
+import re
 import json
+import asyncio
+import contextlib
 import time
-from typing import Dict, List, Any, Optional
+import hashlib
+import importlib
+import importlib.util
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union
 from datetime import datetime
-import tiktoken
 import streamlit as st
 
+from .ai_prompts import (
+    get_prompt,
+    get_prompt_tokens,
+    compile_template,
+    INSIGHT_PROMPTS,
+    INTENT_SCHEMA,
+    BULK_INTENT_SCHEMA,
+    EXECUTIVE_REPORT_PROMPT,
+    INTENT_PARSING_PROMPT,
+    BULK_INTENT_PARSING_PROMPT
+)
+
+# Cache keys only need to be fast and well spread, not cryptographic
 try:
-    from openai import OpenAI
-    from anthropic import Anthropic
+    import xxhash
+
+    def _hash_hexdigest(data: bytes) -> str:
+        return xxhash.xxh3_64_hexdigest(data)
 except ImportError:
-    OpenAI = None
-    Anthropic = None
+    def _hash_hexdigest(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
 
-from .ai_prompts import (
-    SYSTEM_PROMPTS,
-    CONTEXT_TEMPLATES,
-    INSIGHT_PROMPTS,
-    REPORT_PROMPTS,
-    SCENARIO_BUILDING_PROMPTS
+
+# Responses are cached for an hour
+CACHE_TTL = 3600
+
+
+class _ResponseCache:
+    """
+    Bounded in-process LRU response cache with the get/set API of diskcache.Cache.
+    
+    Used when diskcache is not installed. Entries expire after their TTL,
+    measured on the monotonic clock so wall-clock changes cannot extend or
+    cut it short, and the least recently used are evicted beyond
+    max_entries; a lock makes it safe to share between the threads
+    Streamlit runs sessions on.
+    """
+    
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, expire: float = CACHE_TTL):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + expire)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Shared by every session, so identical prompts from different users are
+# answered once; diskcache also keeps answers across restarts
+try:
+    import diskcache
+    _AI_CACHE = diskcache.Cache(
+        os.path.join(tempfile.gettempdir(), "ai_cache"),
+        size_limit=512 << 20
+    )
+except ImportError:
+    _AI_CACHE = _ResponseCache()
+
+
+# Requests being sent right now, by cache key; a second caller for the same
+# key waits for the first instead of paying for its own API call
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _single_flight(cache_key: str, request):
+    """
+    Run request() once for all concurrent callers with the same cache key.
+    
+    Args:
+        cache_key: Key of the response being requested
+        request: Function that calls the API, caches and returns the response
+        
+    Returns:
+        The response; errors raised by request() reach every waiting caller
+    """
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(cache_key)
+        owner = future is None
+        if owner:
+            future = _INFLIGHT[cache_key] = Future()
+    
+    if not owner:
+        return future.result()
+    
+    try:
+        response = request()
+        future.set_result(response)
+        return response
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[cache_key]
+
+
+# JSON goes through orjson when it is installed; sorted keys make equal
+# dicts serialise identically, so they share cache keys
+try:
+    import orjson
+
+    def _canonical_json(obj: Any, indent: bool = False) -> str:
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=str).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _canonical_json(obj: Any, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None, sort_keys=True,
+                          ensure_ascii=False, default=str)
+
+    _json_loads = json.loads
+
+
+@lru_cache(maxsize=32)
+def _join_names(names: Tuple[str, ...]) -> str:
+    """Comma-joined name list for prompts; the lists rarely change between calls."""
+    return ", ".join(names)
+
+
+@lru_cache(maxsize=256)
+def _format_context_items(items: Tuple[Tuple[str, type, Any], ...]) -> str:
+    """
+    Render sorted (key, type, value) context items as "key: value" lines.
+    
+    Memoised because the dashboard sends the same context on every chat
+    turn until the data on screen changes.
+    """
+    return "\n".join([
+        f"{key}: {value:.0f}" if isinstance(value, (int, float)) and value > 1000 else f"{key}: {value}"
+        for key, _, value in items
+    ])
+
+
+# Rough cost estimates in USD per 1k tokens, by model or model family
+_COST_TABLE = {
+    'gpt-4': 0.03,
+    'gpt-4-turbo': 0.01,
+    'gpt-4-turbo-preview': 0.01,
+    'gpt-4o-mini': 0.0003,
+    'claude-opus': 0.015,
+    'claude-opus-4-1': 0.015,
+    'claude-sonnet': 0.003,
+    'claude-sonnet-4-5': 0.003
+}
+
+
+# Model that queued insight requests run on in the OpenAI Batch API
+_BATCH_MODEL = "gpt-4-turbo-preview"
+
+
+# Strict JSON-schema output needs a model with structured-output support
+_STRUCTURED_OUTPUT_MODEL = "gpt-4o-mini"
+_INTENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "scenario_intent", "schema": INTENT_SCHEMA, "strict": True}
+}
+_BULK_INTENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "scenario_intents", "schema": BULK_INTENT_SCHEMA, "strict": True}
+}
+
+
+# Chat messages that need the full model even when short
+_COMPLEX_REQUEST = re.compile(
+    r"report|forecast|analy|compar|scenario|recommend|strateg|تقرير|توقع|تحليل|مقارن|سيناريو"
 )
 
 
+# HTTP/2 needs the optional h2 package
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+@lru_cache(maxsize=1)
+def _get_http_client():
+    """
+    Keep-alive connection pool shared by both SDK clients and every assistant.
+    
+    Requests reuse open TLS connections (multiplexed over HTTP/2 when h2 is
+    installed) instead of each client keeping its own pool. Returns None on
+    SDKs too old to export DefaultHttpxClient, which then use their default.
+    """
+    try:
+        from openai import DefaultHttpxClient
+    except ImportError:
+        return None
+    return DefaultHttpxClient(http2=_HTTP2)
+
+
+def _new_async_http_client():
+    """Async counterpart of _get_http_client for one event loop."""
+    try:
+        from openai import DefaultAsyncHttpxClient
+    except ImportError:
+        return None
+    return DefaultAsyncHttpxClient(http2=_HTTP2)
+
+
+# The SDKs and tiktoken are imported on first use rather than with this
+# module, so dashboard pages that never touch the AI panel start faster
+@lru_cache(maxsize=None)
+def _import_sdk(name: str):
+    """Import an optional SDK module by name, or return None if it is missing."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(model: str):
+    """Tokenizer for a model, loaded once per process (the BPE table is MB-scale)."""
+    import tiktoken
+    return tiktoken.encoding_for_model(model)
+
+
 class AIAssistant:
     """
     AI Assistant for the Ministry of Labour dashboard.
@@ -44,25 +273,33 @@ class AIAssistant:
         self.anthropic_client = None
         self.encoding = None
         
+        openai_sdk = _import_sdk("openai")
+        anthropic_sdk = _import_sdk("anthropic")
+        
         # Initialize OpenAI
-        if openai_api_key and OpenAI:
+        if openai_api_key and openai_sdk:
             try:
-                self.openai_client = OpenAI(api_key=openai_api_key)
-                self.encoding = tiktoken.encoding_for_model("gpt-4")
+                self.openai_client = openai_sdk.OpenAI(api_key=openai_api_key, http_client=_get_http_client())
+                self.encoding = _get_encoding("gpt-4")
             except Exception as e:
                 print(f"OpenAI initialization error: {e}")
         
         # Initialize Anthropic
-        if anthropic_api_key and Anthropic:
+        if anthropic_api_key and anthropic_sdk:
             try:
-                self.anthropic_client = Anthropic(api_key=anthropic_api_key)
+                self.anthropic_client = anthropic_sdk.Anthropic(api_key=anthropic_api_key, http_client=_get_http_client())
             except Exception as e:
                 print(f"Anthropic initialization error: {e}")
         
-        # Initialize cache
-        if 'ai_cache' not in st.session_state:
-            st.session_state.ai_cache = {}
+        self.init_session_state()
+    
+    def init_session_state(self):
+        """
+        Set up per-session cost tracking.
         
+        The assistant itself is shared across sessions, so this runs for
+        every session that picks it up, not only at construction.
+        """
         # Initialize cost tracking
         if 'ai_costs' not in st.session_state:
             st.session_state.ai_costs = {
@@ -77,49 +314,171 @@ class AIAssistant:
             return len(self.encoding.encode(text))
         return len(text.split()) * 1.3  # Rough estimate
     
-    def _get_cache_key(self, prompt: str, context: str = "") -> str:
-        """Generate cache key for a prompt."""
-        import hashlib
-        combined = f"{prompt}:{context}"
-        return hashlib.md5(combined.encode()).hexdigest()
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens in several texts with one tokenizer call.
+        
+        Uses encode_ordinary, which skips the special-token scan; the texts
+        are prompts and responses, never control tokens.
+        
+        Args:
+            texts: Texts to count
+            
+        Returns:
+            Token count per text, in the same order
+        """
+        if self.encoding:
+            return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts, num_threads=4)]
+        return [len(text.split()) * 1.3 for text in texts]  # Rough estimate
+    
+    def _system_prompt_tokens(self, language: str, kind: str) -> int:
+        """Token count of a static system prompt, encoded once per process."""
+        tokens = get_prompt_tokens(("system", language, kind)) if self.encoding else None
+        if tokens is None:
+            return self.count_tokens(get_prompt("system", language, kind))
+        return len(tokens)
+    
+    def _get_cache_key(self, prompt: str, context: Any = "", language: str = "en") -> str:
+        """
+        Generate cache key for a prompt.
+        
+        The cache is shared by every session, so the key covers everything
+        that decides the answer, including the response language.
+        Non-string context is serialised canonically, so contexts that
+        differ only in key order share a key.
+        """
+        if not isinstance(context, str):
+            context = _canonical_json(context)
+        # A unit separator keeps ("a:b", "") and ("a", "b") apart
+        return _hash_hexdigest(
+            prompt.encode() + b"\x1f" + context.encode() + b"\x1f" + language.encode()
+        )
     
     def _check_cache(self, cache_key: str) -> Optional[str]:
         """Check if response is cached."""
-        if cache_key in st.session_state.ai_cache:
-            cached = st.session_state.ai_cache[cache_key]
-            # Cache valid for 1 hour
-            if time.time() - cached['timestamp'] < 3600:
-                return cached['response']
-        return None
+        return _AI_CACHE.get(cache_key)
     
     def _save_to_cache(self, cache_key: str, response: str):
         """Save response to cache."""
-        st.session_state.ai_cache[cache_key] = {
-            'response': response,
-            'timestamp': time.time()
-        }
+        _AI_CACHE.set(cache_key, response, expire=CACHE_TTL)
     
-    def _update_costs(self, tokens: int, model: str = "gpt-4"):
-        """Update cost tracking."""
-        # Rough cost estimates
-        cost_per_1k = {
-            'gpt-4': 0.03,
-            'gpt-4-turbo': 0.01,
-            'claude-opus': 0.015,
-            'claude-sonnet': 0.003
-        }
+    def _update_costs(self, tokens: int, model: str = "gpt-4", rate_factor: float = 1.0):
+        """
+        Update cost tracking.
+        
+        Args:
+            tokens: Tokens used by the request
+            model: Model the request ran on
+            rate_factor: Share of the interactive price actually billed
+        """
+        cost = (tokens / 1000) * _COST_TABLE.get(model, 0.01) * rate_factor
+        
+        # One session_state lookup instead of one per counter
+        costs = st.session_state.ai_costs
+        costs['total_tokens'] += tokens
+        costs['estimated_cost'] += cost
+        costs['requests'] += 1
+    
+    def _select_model(self, message: str, task: str = "chat") -> str:
+        """
+        Pick the cheapest model suited to a request.
+        
+        Short chat questions that ask for no analysis go to gpt-4o-mini,
+        which is far cheaper and faster; everything else keeps the full
+        model for its task.
+        
+        Args:
+            message: User message or prompt
+            task: "chat", "insights" or "report"
+            
+        Returns:
+            Model id to send the request to
+        """
+        if task == "report":
+            return "claude-opus-4-1"
+        if task == "insights":
+            return "claude-sonnet-4-5"
+        if self.count_tokens(message) < 50 and not _COMPLEX_REQUEST.search(message.lower()):
+            return "gpt-4o-mini"
+        return "gpt-4-turbo-preview"
+    
+    def _build_chat_messages(
+        self,
+        message: str,
+        context: Union[Dict[str, Any], str] = None,
+        language: str = "en",
+        chat_history: List[Dict] = None
+    ) -> List[Dict]:
+        """
+        Build the OpenAI message list for a chat turn.
         
-        rate = cost_per_1k.get(model, 0.01)
-        cost = (tokens / 1000) * rate
+        OpenAI caches long prompt prefixes automatically, so the fixed
+        system prompt and the history come first and the context, which
+        changes with the data on screen, sits next to the new message.
+        """
+        # Build messages
+        messages = [{"role": "system", "content": get_prompt("system", language, "chat")}]
+        
+        # Add chat history
+        if chat_history:
+            messages.extend(self._trim_history(chat_history))
+        
+        # Add context if provided
+        if context:
+            # Text already rendered from a context template is used as is
+            context_text = context.strip() if isinstance(context, str) else self._format_context(context)
+            messages.append({"role": "system", "content": f"Current Context:\n{context_text}"})
+        
+        # Add current message
+        messages.append({"role": "user", "content": message})
+        return messages
+    
+    def _trim_history(self, history: List[Dict], budget: int = 4000) -> List[Dict]:
+        """
+        Most recent chat messages that fit in a token budget.
         
-        st.session_state.ai_costs['total_tokens'] += tokens
-        st.session_state.ai_costs['estimated_cost'] += cost
-        st.session_state.ai_costs['requests'] += 1
+        A fixed message count can still overflow the context window with a
+        few long answers, or drop useful turns when messages are short.
+        
+        Args:
+            history: Chat messages, oldest first
+            budget: Maximum tokens of message content to keep
+            
+        Returns:
+            The newest messages whose contents total at most budget tokens
+        """
+        counts = self.count_tokens_batch([msg["content"] for msg in history])
+        used = 0
+        start = len(history)
+        for count in reversed(counts):
+            if used + count > budget:
+                break
+            used += count
+            start -= 1
+        return history[start:]
+    
+    def _build_insight_prompt(self, data_summary: Dict[str, Any], insight_type: str) -> str:
+        """Fill the insight template for insight_type with the data summary."""
+        template = INSIGHT_PROMPTS.get(insight_type, INSIGHT_PROMPTS["executive_summary"])
+        return compile_template(template)(data_summary)
+    
+    def _build_report_prompt(
+        self,
+        data_summary: Dict[str, Any],
+        scenario_info: Dict[str, Any] = None
+    ) -> str:
+        """Fill the executive report template with the data and scenario."""
+        data_str = _canonical_json(data_summary, indent=True)
+        scenario_str = _canonical_json(scenario_info, indent=True) if scenario_info else "No active scenario"
+        return compile_template(EXECUTIVE_REPORT_PROMPT)({
+            "data_summary": data_str,
+            "scenario_info": scenario_str
+        })
     
     def chat(
         self, 
         message: str, 
-        context: Dict[str, Any] = None,
+        context: Union[Dict[str, Any], str] = None,
         language: str = "en",
         chat_history: List[Dict] = None
     ) -> str:
@@ -128,7 +487,8 @@ class AIAssistant:
         
         Args:
             message: User message
-            context: Dashboard context (current page, data, etc.)
+            context: Dashboard context (current page, data, etc.), as a
+                dict or as text from ai_prompts.render_context
             language: Language preference ("en" or "ar")
             chat_history: Previous chat messages
             
@@ -139,48 +499,38 @@ class AIAssistant:
             return "AI chat is not available. Please configure OpenAI API key."
         
         try:
-            # Build system prompt
-            system_prompt = SYSTEM_PROMPTS[language]["chat"]
-            
-            # Add context if provided
-            if context:
-                context_text = self._format_context(context)
-                system_prompt += f"\n\nCurrent Context:\n{context_text}"
+            messages = self._build_chat_messages(message, context, language, chat_history)
+            model = self._select_model(message, "chat")
             
-            # Build messages
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            # Add chat history
-            if chat_history:
-                messages.extend(chat_history[-10:])  # Last 10 messages
-            
-            # Add current message
-            messages.append({"role": "user", "content": message})
-            
-            # Check cache
-            cache_key = self._get_cache_key(message, str(context))
+            # Keyed on the full message list: the same question means
+            # something else after a different conversation
+            cache_key = self._get_cache_key(model, messages, language)
             cached_response = self._check_cache(cache_key)
             if cached_response:
                 return cached_response
             
-            # Call OpenAI
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=messages,
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            ai_response = response.choices[0].message.content
-            
-            # Update costs
-            total_tokens = response.usage.total_tokens
-            self._update_costs(total_tokens, "gpt-4-turbo")
-            
-            # Cache response
-            self._save_to_cache(cache_key, ai_response)
-            
-            return ai_response
+            def request():
+                # Call OpenAI
+                response = self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=1000,
+                    temperature=0.7
+                )
+                
+                ai_response = response.choices[0].message.content
+                
+                # Update costs
+                total_tokens = response.usage.total_tokens
+                self._update_costs(total_tokens, model)
+                
+                # Cache response
+                self._save_to_cache(cache_key, ai_response)
+                
+                return ai_response
+                
+            # Identical requests already in flight share that API call
+            return _single_flight(cache_key, request)
             
         except Exception as e:
             return f"Error generating response: {str(e)}"
@@ -207,36 +557,37 @@ class AIAssistant:
             return self._generate_insights_openai(data_summary, insight_type, language)
         
         try:
-            # Get prompt template
-            prompt_template = INSIGHT_PROMPTS.get(insight_type, INSIGHT_PROMPTS["executive_summary"])
-            
-            # Format prompt with data
-            prompt = prompt_template.format(**data_summary)
+            prompt = self._build_insight_prompt(data_summary, insight_type)
+            model = self._select_model(prompt, "insights")
             
             # Check cache
-            cache_key = self._get_cache_key(prompt, insight_type)
+            cache_key = self._get_cache_key(prompt, insight_type, language)
             cached_response = self._check_cache(cache_key)
             if cached_response:
                 return cached_response
             
-            # Call Claude - using Sonnet 4.5 (Latest - Best for complex reasoning)
-            message = self.anthropic_client.messages.create(
-                model="claude-sonnet-4-5",
-                max_tokens=1500,
-                system=SYSTEM_PROMPTS[language]["insights"],
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            insights = message.content[0].text
-            
-            # Update costs (approximate)
-            tokens = self.count_tokens(prompt + insights)
-            self._update_costs(tokens, "claude-sonnet")
-            
-            # Cache response
-            self._save_to_cache(cache_key, insights)
-            
-            return insights
+            def request():
+                # Call Claude - using Sonnet 4.5 (Latest - Best for complex reasoning)
+                message = self.anthropic_client.messages.create(
+                    model=model,
+                    max_tokens=1500,
+                    system=get_prompt("system", language, "insights"),
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                
+                insights = message.content[0].text
+                
+                # Update costs (approximate)
+                tokens = self._system_prompt_tokens(language, "insights") + sum(self.count_tokens_batch([prompt, insights]))
+                self._update_costs(tokens, model)
+                
+                # Cache response
+                self._save_to_cache(cache_key, insights)
+                
+                return insights
+                
+            # Identical requests already in flight share that API call
+            return _single_flight(cache_key, request)
             
         except Exception as e:
             return f"Error generating insights: {str(e)}"
@@ -252,13 +603,18 @@ class AIAssistant:
             return "AI insights unavailable. Please configure API keys."
         
         try:
-            prompt_template = INSIGHT_PROMPTS.get(insight_type)
-            prompt = prompt_template.format(**data_summary)
+            prompt = self._build_insight_prompt(data_summary, insight_type)
+            
+            # Answers from submit_batch_insights land under the same key
+            cache_key = self._get_cache_key(prompt, insight_type, language)
+            cached_response = self._check_cache(cache_key)
+            if cached_response:
+                return cached_response
             
             response = self.openai_client.chat.completions.create(
                 model="gpt-4-turbo-preview",
                 messages=[
-                    {"role": "system", "content": SYSTEM_PROMPTS[language]["insights"]},
+                    {"role": "system", "content": get_prompt("system", language, "insights")},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=1500,
@@ -290,40 +646,37 @@ class AIAssistant:
             return self._generate_report_openai(data_summary, scenario_info, language)
         
         try:
-            # Format data
-            data_str = json.dumps(data_summary, indent=2)
-            scenario_str = json.dumps(scenario_info, indent=2) if scenario_info else "No active scenario"
-            
-            # Build prompt
-            prompt = REPORT_PROMPTS["executive_report"].format(
-                data_summary=data_str,
-                scenario_info=scenario_str
-            )
+            prompt = self._build_report_prompt(data_summary, scenario_info)
+            model = self._select_model(prompt, "report")
             
             # Check cache
-            cache_key = self._get_cache_key(prompt, "report")
+            cache_key = self._get_cache_key(prompt, "report", language)
             cached_response = self._check_cache(cache_key)
             if cached_response:
                 return cached_response
             
-            # Call Claude with longer context - using Opus 4.1 for exceptional reasoning in reports
-            message = self.anthropic_client.messages.create(
-                model="claude-opus-4-1",
-                max_tokens=4000,
-                system=SYSTEM_PROMPTS[language]["report"],
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            report = message.content[0].text
-            
-            # Update costs
-            tokens = self.count_tokens(prompt + report)
-            self._update_costs(tokens, "claude-sonnet")
-            
-            # Cache
-            self._save_to_cache(cache_key, report)
-            
-            return report
+            def request():
+                # Call Claude with longer context - using Opus 4.1 for exceptional reasoning in reports
+                message = self.anthropic_client.messages.create(
+                    model=model,
+                    max_tokens=4000,
+                    system=get_prompt("system", language, "report"),
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                
+                report = message.content[0].text
+                
+                # Update costs
+                tokens = self._system_prompt_tokens(language, "report") + sum(self.count_tokens_batch([prompt, report]))
+                self._update_costs(tokens, model)
+                
+                # Cache
+                self._save_to_cache(cache_key, report)
+                
+                return report
+                
+            # Identical requests already in flight share that API call
+            return _single_flight(cache_key, request)
             
         except Exception as e:
             return f"Error generating report: {str(e)}"
@@ -339,18 +692,12 @@ class AIAssistant:
             return "Report generation unavailable. Please configure API keys."
         
         try:
-            data_str = json.dumps(data_summary, indent=2)
-            scenario_str = json.dumps(scenario_info, indent=2) if scenario_info else "No active scenario"
-            
-            prompt = REPORT_PROMPTS["executive_report"].format(
-                data_summary=data_str,
-                scenario_info=scenario_str
-            )
+            prompt = self._build_report_prompt(data_summary, scenario_info)
             
             response = self.openai_client.chat.completions.create(
                 model="gpt-4-turbo-preview",
                 messages=[
-                    {"role": "system", "content": SYSTEM_PROMPTS[language]["report"]},
+                    {"role": "system", "content": get_prompt("system", language, "report")},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=4000,
@@ -361,6 +708,385 @@ class AIAssistant:
         except Exception as e:
             return f"Error: {str(e)}"
     
+    def chat_stream(
+        self,
+        message: str,
+        context: Union[Dict[str, Any], str] = None,
+        language: str = "en",
+        chat_history: List[Dict] = None
+    ) -> Iterator[str]:
+        """
+        Streaming version of chat() for st.write_stream.
+        
+        Text is yielded as it is generated, so the answer starts appearing
+        after the first tokens instead of after the whole completion. The
+        full answer is still cached and costed once the stream ends.
+        
+        Yields:
+            Pieces of the AI response
+        """
+        if not self.openai_client:
+            yield "AI chat is not available. Please configure OpenAI API key."
+            return
+        
+        try:
+            messages = self._build_chat_messages(message, context, language, chat_history)
+            model = self._select_model(message, "chat")
+            
+            cache_key = self._get_cache_key(model, messages, language)
+            cached_response = self._check_cache(cache_key)
+            if cached_response:
+                yield cached_response
+                return
+            
+            stream = self.openai_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.7,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            parts = []
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+                # Usage arrives on the final chunk, which has no choices
+                if chunk.usage:
+                    self._update_costs(chunk.usage.total_tokens, model)
+            
+            self._save_to_cache(cache_key, "".join(parts))
+            
+        except Exception as e:
+            yield f"Error generating response: {str(e)}"
+    
+    def report_stream(
+        self,
+        data_summary: Dict[str, Any],
+        scenario_info: Dict[str, Any] = None,
+        language: str = "en"
+    ) -> Iterator[str]:
+        """
+        Streaming version of generate_report() for st.write_stream.
+        
+        Yields:
+            Pieces of the report; the OpenAI fallback yields it whole
+        """
+        if not self.anthropic_client:
+            yield self._generate_report_openai(data_summary, scenario_info, language)
+            return
+        
+        try:
+            prompt = self._build_report_prompt(data_summary, scenario_info)
+            model = self._select_model(prompt, "report")
+            
+            cache_key = self._get_cache_key(prompt, "report", language)
+            cached_response = self._check_cache(cache_key)
+            if cached_response:
+                yield cached_response
+                return
+            
+            parts = []
+            with self.anthropic_client.messages.stream(
+                model=model,
+                max_tokens=4000,
+                system=get_prompt("system", language, "report"),
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                for text in stream.text_stream:
+                    parts.append(text)
+                    yield text
+            
+            report = "".join(parts)
+            tokens = self._system_prompt_tokens(language, "report") + sum(self.count_tokens_batch([prompt, report]))
+            self._update_costs(tokens, model)
+            self._save_to_cache(cache_key, report)
+            
+        except Exception as e:
+            yield f"Error generating report: {str(e)}"
+    
+    @contextlib.asynccontextmanager
+    async def _async_clients(self):
+        """
+        Async SDK clients for the running event loop, closed on exit.
+        
+        The assistant is shared by every session, and pooled connections
+        cannot outlive the loop they were opened on, so the clients are
+        never stored on it; each run_many() opens its own pair.
+        
+        Yields:
+            (AsyncOpenAI or None, AsyncAnthropic or None)
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            openai_async = anthropic_async = None
+            if self.openai_client:
+                openai_async = await stack.enter_async_context(_import_sdk("openai").AsyncOpenAI(
+                    api_key=self.openai_client.api_key, http_client=_new_async_http_client()
+                ))
+            if self.anthropic_client:
+                anthropic_async = await stack.enter_async_context(_import_sdk("anthropic").AsyncAnthropic(
+                    api_key=self.anthropic_client.api_key, http_client=_new_async_http_client()
+                ))
+            yield openai_async, anthropic_async
+    
+    async def achat(
+        self,
+        message: str,
+        context: Union[Dict[str, Any], str] = None,
+        language: str = "en",
+        chat_history: List[Dict] = None,
+        clients: Optional[Tuple[Any, Any]] = None
+    ) -> str:
+        """
+        Async version of chat(), for use with run_many().
+        
+        clients is the pair from _async_clients(); without it the call
+        opens and closes its own.
+        """
+        if clients is None:
+            async with self._async_clients() as clients:
+                return await self.achat(message, context, language, chat_history, clients)
+        openai_async, _ = clients
+        if not openai_async:
+            return "AI chat is not available. Please configure OpenAI API key."
+        
+        try:
+            messages = self._build_chat_messages(message, context, language, chat_history)
+            model = self._select_model(message, "chat")
+            
+            cache_key = self._get_cache_key(model, messages, language)
+            cached_response = self._check_cache(cache_key)
+            if cached_response:
+                return cached_response
+            
+            response = await openai_async.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.7
+            )
+            
+            ai_response = response.choices[0].message.content
+            self._update_costs(response.usage.total_tokens, model)
+            self._save_to_cache(cache_key, ai_response)
+            return ai_response
+            
+        except Exception as e:
+            return f"Error generating response: {str(e)}"
+    
+    async def ainsights(
+        self,
+        data_summary: Dict[str, Any],
+        insight_type: str = "executive_summary",
+        language: str = "en",
+        clients: Optional[Tuple[Any, Any]] = None
+    ) -> str:
+        """Async version of generate_insights(), for use with run_many(); see achat() for clients."""
+        if clients is None:
+            async with self._async_clients() as clients:
+                return await self.ainsights(data_summary, insight_type, language, clients)
+        openai_async, anthropic_async = clients
+        if not anthropic_async and not openai_async:
+            return "AI insights unavailable. Please configure API keys."
+        
+        try:
+            prompt = self._build_insight_prompt(data_summary, insight_type)
+            model = self._select_model(prompt, "insights")
+            
+            cache_key = self._get_cache_key(prompt, insight_type, language)
+            cached_response = self._check_cache(cache_key)
+            if cached_response:
+                return cached_response
+            
+            if not anthropic_async:
+                # Fallback to OpenAI if Claude not available
+                response = await openai_async.chat.completions.create(
+                    model="gpt-4-turbo-preview",
+                    messages=[
+                        {"role": "system", "content": get_prompt("system", language, "insights")},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=1500,
+                    temperature=0.7
+                )
+                return response.choices[0].message.content
+            
+            message = await anthropic_async.messages.create(
+                model=model,
+                max_tokens=1500,
+                system=get_prompt("system", language, "insights"),
+                messages=[{"role": "user", "content": prompt}]
+            )
+            
+            insights = message.content[0].text
+            tokens = self._system_prompt_tokens(language, "insights") + sum(self.count_tokens_batch([prompt, insights]))
+            self._update_costs(tokens, model)
+            self._save_to_cache(cache_key, insights)
+            return insights
+            
+        except Exception as e:
+            return f"Error generating insights: {str(e)}"
+    
+    async def areport(
+        self,
+        data_summary: Dict[str, Any],
+        scenario_info: Dict[str, Any] = None,
+        language: str = "en",
+        clients: Optional[Tuple[Any, Any]] = None
+    ) -> str:
+        """Async version of generate_report(), for use with run_many(); see achat() for clients."""
+        if clients is None:
+            async with self._async_clients() as clients:
+                return await self.areport(data_summary, scenario_info, language, clients)
+        _, anthropic_async = clients
+        if not anthropic_async:
+            return await asyncio.to_thread(
+                self._generate_report_openai, data_summary, scenario_info, language
+            )
+        
+        try:
+            prompt = self._build_report_prompt(data_summary, scenario_info)
+            model = self._select_model(prompt, "report")
+            
+            cache_key = self._get_cache_key(prompt, "report", language)
+            cached_response = self._check_cache(cache_key)
+            if cached_response:
+                return cached_response
+            
+            message = await anthropic_async.messages.create(
+                model=model,
+                max_tokens=4000,
+                system=get_prompt("system", language, "report"),
+                messages=[{"role": "user", "content": prompt}]
+            )
+            
+            report = message.content[0].text
+            tokens = self._system_prompt_tokens(language, "report") + sum(self.count_tokens_batch([prompt, report]))
+            self._update_costs(tokens, model)
+            self._save_to_cache(cache_key, report)
+            return report
+            
+        except Exception as e:
+            return f"Error generating report: {str(e)}"
+    
+    async def run_many(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """
+        Run several assistant calls concurrently.
+        
+        The requests are independent, so their network and generation time
+        overlaps and the batch takes about as long as the slowest call.
+        From a Streamlit handler: ``asyncio.run(ai.run_many([...]))``.
+        
+        Args:
+            calls: (method, kwargs) pairs where method is "chat", "insights"
+                or "report", e.g. ("insights", {"data_summary": summary})
+            
+        Returns:
+            One response per call, in the order given
+        """
+        dispatch = {"chat": self.achat, "insights": self.ainsights, "report": self.areport}
+        # One client pair for the whole batch, closed before returning
+        async with self._async_clients() as clients:
+            return await asyncio.gather(*[
+                dispatch[method](**kwargs, clients=clients) for method, kwargs in calls
+            ])
+    
+    def submit_batch_insights(self, jobs: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Queue insight requests on the OpenAI Batch API.
+        
+        Batched requests cost about half as much and do not count against
+        the interactive rate limits, which suits insights that can be
+        precomputed (e.g. after a data refresh). Each job's custom_id is the
+        cache key generate_insights would use, so fetch_batch_results makes
+        the answers available to later generate_insights calls.
+        
+        Args:
+            jobs: Dicts with "data_summary" and optionally "insight_type"
+                and "language", as passed to generate_insights
+            
+        Returns:
+            Batch id to pass to fetch_batch_results, or None when OpenAI
+            is not configured
+        """
+        if not self.openai_client:
+            return None
+        
+        # The Batch API rejects repeated custom_ids, and identical jobs
+        # would get the same answer anyway, so each key is sent once
+        lines = {}
+        for job in jobs:
+            insight_type = job.get("insight_type", "executive_summary")
+            language = job.get("language", "en")
+            prompt = self._build_insight_prompt(job["data_summary"], insight_type)
+            cache_key = self._get_cache_key(prompt, insight_type, language)
+            if cache_key in lines:
+                continue
+            lines[cache_key] = json.dumps({
+                "custom_id": cache_key,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": _BATCH_MODEL,
+                    "messages": [
+                        {"role": "system", "content": get_prompt("system", language, "insights")},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "max_tokens": 1500,
+                    "temperature": 0.7
+                }
+            }, ensure_ascii=False)
+        
+        batch_file = self.openai_client.files.create(
+            file=("insights.jsonl", "\n".join(lines.values()).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+    
+    def fetch_batch_results(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Check a batch and cache its answers once it has completed.
+        
+        Args:
+            batch_id: Id returned by submit_batch_insights
+            
+        Returns:
+            Dict with the batch "status" and the number of answers "cached"
+        """
+        if not self.openai_client:
+            return {"status": "unavailable", "cached": 0}
+        
+        batch = self.openai_client.batches.retrieve(batch_id)
+        if batch.status != "completed" or not batch.output_file_id:
+            return {"status": batch.status, "cached": 0}
+        
+        cached = 0
+        output = self.openai_client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = _json_loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            # Answers cached by an earlier poll were already counted
+            if self._check_cache(result["custom_id"]) is not None:
+                continue
+            body = response["body"]
+            self._save_to_cache(result["custom_id"], body["choices"][0]["message"]["content"])
+            # Batch requests are billed at half the interactive rate
+            self._update_costs(body["usage"]["total_tokens"], _BATCH_MODEL, rate_factor=0.5)
+            cached += 1
+        
+        return {"status": batch.status, "cached": cached}
+    
     def parse_scenario_intent(
         self,
         user_input: str,
@@ -385,30 +1111,90 @@ class AIAssistant:
         
         try:
             # Build prompt
-            prompt = SCENARIO_BUILDING_PROMPTS["intent_parsing"].format(
-                user_input=user_input,
-                service_list=", ".join(service_list[:20]),  # First 20 services
-                category_list=", ".join(category_list)
-            )
+            prompt = compile_template(INTENT_PARSING_PROMPT)({
+                "user_input": user_input,
+                "service_list": _join_names(tuple(service_list[:20])),  # First 20 services
+                "category_list": _join_names(tuple(category_list))
+            })
             
-            # Call OpenAI with JSON mode
+            # Call OpenAI with the intent schema enforced
             response = self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
+                model=_STRUCTURED_OUTPUT_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a JSON parser. Return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
-                response_format={"type": "json_object"},
+                response_format=_INTENT_RESPONSE_FORMAT,
                 max_tokens=1000,
                 temperature=0.3
             )
             
-            intent = json.loads(response.choices[0].message.content)
+            intent = _json_loads(response.choices[0].message.content)
             return intent
             
         except Exception as e:
             return {"error": str(e)}
     
+    def parse_scenario_intents_bulk(
+        self,
+        user_inputs: List[str],
+        service_list: List[str],
+        category_list: List[str],
+        language: str = "en",
+        batch_size: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Parse several scenario requests with one model call per batch.
+        
+        Every call repeats the instructions and service list, so grouping
+        requests shares that overhead and the round trip; batches are kept
+        small because long answer arrays get slower and less reliable.
+        
+        Args:
+            user_inputs: Users' scenario descriptions
+            service_list: Available services
+            category_list: Available categories
+            language: Language preference
+            batch_size: Requests parsed per model call
+            
+        Returns:
+            Structured scenario intent per input, in order; a batch that
+            fails yields {"error": ...} for each of its inputs
+        """
+        if not self.openai_client:
+            return [{"error": "AI unavailable"} for _ in user_inputs]
+        
+        intents = []
+        for start in range(0, len(user_inputs), batch_size):
+            batch = user_inputs[start:start + batch_size]
+            try:
+                prompt = compile_template(BULK_INTENT_PARSING_PROMPT)({
+                    "count": len(batch),
+                    "user_inputs": "\n".join(f'{i}. "{text}"' for i, text in enumerate(batch, 1)),
+                    "service_list": _join_names(tuple(service_list[:20])),  # First 20 services
+                    "category_list": _join_names(tuple(category_list))
+                })
+                
+                response = self.openai_client.chat.completions.create(
+                    model=_STRUCTURED_OUTPUT_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are a JSON parser. Return only valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format=_BULK_INTENT_RESPONSE_FORMAT,
+                    max_tokens=min(1000 * len(batch), 4000),
+                    temperature=0.3
+                )
+                
+                results = _json_loads(response.choices[0].message.content)["results"]
+                if len(results) != len(batch):
+                    raise ValueError(f"expected {len(batch)} results, got {len(results)}")
+                intents.extend(results)
+            except Exception as e:
+                intents.extend({"error": str(e)} for _ in batch)
+        
+        return intents
+    
     def explain_chart(
         self,
         chart_type: str,
@@ -437,16 +1223,14 @@ class AIAssistant:
     
     def _format_context(self, context: Dict[str, Any]) -> str:
         """Format context dictionary into readable text."""
-        lines = []
-        for key, value in context.items():
-            if isinstance(value, (int, float)):
-                if value > 1000:
-                    lines.append(f"{key}: {value:,.0f}")
-                else:
-                    lines.append(f"{key}: {value}")
-            else:
-                lines.append(f"{key}: {value}")
-        return "\n".join(lines)
+        # Sorted so the same context always renders to the same prompt text;
+        # the type is part of the key because 5 == 5.0 but they render apart
+        items = tuple((key, type(value), value) for key, value in sorted(context.items()))
+        try:
+            return _format_context_items(items)
+        except TypeError:
+            # Unhashable values (lists, dicts) cannot be memoised
+            return _format_context_items.__wrapped__(items)
     
     def get_cost_summary(self) -> Dict[str, Any]:
         """Get current session cost summary."""
@@ -465,6 +1249,12 @@ class AIAssistant:
         return self.openai_client is not None or self.anthropic_client is not None
 
 
+@st.cache_resource(show_spinner=False)
+def _build_ai_assistant(openai_key: Optional[str], anthropic_key: Optional[str]) -> AIAssistant:
+    """Build the API clients once per process and key pair, not per rerun."""
+    return AIAssistant(openai_key, anthropic_key)
+
+
 def load_ai_assistant() -> Optional[AIAssistant]:
     """
     Load AI assistant with API keys from environment.
@@ -482,7 +1272,9 @@ def load_ai_assistant() -> Optional[AIAssistant]:
         if not openai_key and not anthropic_key:
             return None
         
-        return AIAssistant(openai_key, anthropic_key)
+        assistant = _build_ai_assistant(openai_key, anthropic_key)
+        assistant.init_session_state()
+        return assistant
     except Exception as e:
         print(f"Error loading AI assistant: {e}")
         return None
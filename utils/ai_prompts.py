@@ -1,6 +1,10 @@
 """
 AI Prompt templates for Ministry of Labour Dashboard.
 """
+import string
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Final, Iterable, Mapping, Optional, Tuple
 
 # System prompts for different AI providers
 SYSTEM_PROMPTS = {
@@ -58,54 +62,33 @@ Create a comprehensive, professional report that includes:
 
 Be formal, data-driven, and strategic."""
     },
-    "ar": {
-        "chat": """أنت مساعد ذكي للوحة تحكم استراتيجية الرسوم بوزارة العمل.
-تساعد المستخدمين على تحليل رسوم الخدمات وفهم البيانات واتخاذ قرارات مستنيرة حول هياكل الرسوم.
-
-دورك:
-- الإجابة على الأسئلة حول بيانات الخدمات واستراتيجيات الرسوم
-- تقديم توصيات واضحة وقابلة للتنفيذ
-- شرح المفاهيم المعقدة بعبارات بسيطة
-- مراعاة التوازن بين تحسين الإيرادات والخدمة العامة
-- استخدام أرقام محددة من البيانات عند توفرها
-
-كن موجزاً ومهنياً ومفيداً. ركز على الدقة قبل كل شيء.""",
-        
-        "insights": """أنت مستشار أول لتحسين الإيرادات في القطاع العام بخبرة 15+ عاماً في دول مجلس التعاون الخليجي.
-
-قم بإنشاء رؤى استراتيجية بهذا التنسيق:
+    # Arabic requests get English instructions plus LANG_SUFFIX["ar"] (see
+    # below): Arabic text takes several times more tokens than English, and
+    # the model still answers in Arabic
+    "ar": {}
+}
 
-**الهيكل:**
-1. ابدأ بملخص تنفيذي (3-4 نقاط، سطر واحد لكل نقطة)
-2. ثم قدم 4-6 رؤى تفصيلية
+# Appended to the system prompt for the response language
+LANG_SUFFIX = {
+    "en": "",
+    "ar": "\n\nIMPORTANT: Respond entirely in Modern Standard Arabic."
+}
 
-**كل رؤية يجب أن:**
-1. تشير إلى المقترحات الموثقة الفعلية (النص العربي المحدد ومبالغ الريال القطري)
-2. تشمل تحذيرات الافتراضات: "(بافتراض متوسط X أشهر - تحقق من البيانات التاريخية)"
-3. تستخدم أطر زمنية نسبية: "المرحلة 1 (الأشهر 1-3)" بدلاً من تواريخ محددة
-4. تقييم المخاطر المحدد: "مرونة الطلب: <5٪" أو "الحساسية السياسية: متوسطة"
+# Amounts are sent without thousands separators, which take extra tokens;
+# the model adds them back in its answer
+AMOUNT_FORMAT_NOTE = (
+    "\n\nAll monetary values and counts are given as plain numbers (QAR for amounts); "
+    "always display them with thousands separators in your response."
+)
 
-**التنسيق:**
-- عنوان بخط عريض (جملة واحدة)
-- 2-3 جمل مع اسم الخدمة بالعربية، المبالغ الدقيقة، حساب الإيرادات
-- الإجراء الموصى به: [خطوة محددة مع توقيت المرحلة]
+# Every instruction is shared with English; only the language directive differs
+for _kind in SYSTEM_PROMPTS["en"]:
+    SYSTEM_PROMPTS["en"][_kind] += AMOUNT_FORMAT_NOTE
+    SYSTEM_PROMPTS["ar"][_kind] = SYSTEM_PROMPTS["en"][_kind] + LANG_SUFFIX["ar"]
+del _kind
 
-**الإيجاز:** 
-- الملخص التنفيذي: 4 نقاط كحد أقصى
-- كل رؤية: 4-5 جمل كحد أقصى
-- المجموع: ~600-800 كلمة""",
-        
-        "report": """أنت مستشار أول يعد تقريراً تنفيذياً لقيادة وزارة العمل.
-أنشئ تقريراً شاملاً واحترافياً يتضمن:
-- ملخص تنفيذي
-- تحليل الوضع الحالي
-- توصيات استراتيجية مع المبررات
-- تقييم المخاطر
-- خارطة طريق التنفيذ
-
-كن رسمياً ومعتمداً على البيانات واستراتيجياً."""
-    }
-}
+# One line per service in the {top_10_services} context block
+TOP_SERVICE_ROW = "- {name}: {requests:.0f} requests, {fee} QAR fee"
 
 # Context templates
 CONTEXT_TEMPLATES = {
@@ -113,58 +96,82 @@ CONTEXT_TEMPLATES = {
 Dashboard Context:
 - Current Page: {page}
 - Total Services: {total_services}
-- Total Requests: {total_requests:,}
+- Total Requests: {total_requests:.0f}
 - Services Without Fees: {services_without_fees}
-- Current Total Revenue: {current_revenue:,.0f} QAR
+- Current Total Revenue: {current_revenue:.0f} QAR
 - Active Scenario: {scenario_name}
+- Top Services by Volume:
+{top_10_services}
 """,
     
     "service_context": """
 Service Details:
 - Name: {service_name}
 - Category: {category}
-- Total Requests: {requests:,}
+- Total Requests: {requests:.0f}
 - Current Fee: {current_fee} QAR
-- Annual Revenue: {revenue:,.0f} QAR
+- Annual Revenue: {revenue:.0f} QAR
 - Growth Rate: {growth_rate:.1f}%
 """,
     
     "scenario_context": """
 Scenario: {scenario_name}
 - Services Modified: {num_services}
-- Revenue Increase: {revenue_increase:,.0f} QAR ({revenue_pct:.1f}%)
-- Total Revenue: {total_revenue:,.0f} QAR
+- Revenue Increase: {revenue_increase:.0f} QAR ({revenue_pct:.1f}%)
+- Total Revenue: {total_revenue:.0f} QAR
 """
 }
 
 # Example prompts for users
 EXAMPLE_QUESTIONS = {
-    "en": [
+    "en": (
         "Which services should I prioritize for adding fees?",
         "What's the best strategy to increase revenue by 20%?",
         "Explain the Pareto analysis chart",
         "What are the risks of adding 50 QAR to high-volume services?",
         "How can I implement fees without affecting demand significantly?"
-    ],
-    "ar": [
+    ),
+    "ar": (
         "ما الخدمات التي يجب أن أعطيها الأولوية لإضافة رسوم؟",
         "ما أفضل استراتيجية لزيادة الإيرادات بنسبة 20٪؟",
         "اشرح مخطط تحليل باريتو",
         "ما مخاطر إضافة 50 ريال للخدمات عالية الحجم؟",
         "كيف يمكنني تطبيق رسوم دون التأثير على الطلب بشكل كبير؟"
-    ]
+    )
 }
 
+# Requirements for each generated insight; the response language is set
+# by the system prompt, so one English copy serves both languages
+INSIGHT_REQUIREMENTS = """**EACH INSIGHT MUST:**
+
+1. **Reference ACTUAL documented suggestions** - Cite specific Arabic text and exact QAR amounts from operational data
+2. **Prioritize by revenue impact** - Lead with highest-impact documented opportunities
+3. **Assess implementation feasibility** - Distinguish employer-paid (low risk) vs employee-paid (politically sensitive)
+4. **Recognize fee structure sophistication** - Note conditional pricing (gov't vs private), tiered rates, per-person/per-month structures
+5. **Include assumption caveats** - When assuming durations or elasticity, explicitly state: "(Assumes X-month average duration - verify with historical data)" or "(Estimated Y% demand drop - monitor in pilot phase)"
+6. **Use RELATIVE timeframes** - Phases 1-3 (Months 1-3, 4-6, 7-12) instead of specific quarters/years
+
+**FORMAT FOR EACH INSIGHT:**
+- Bold insight header (one sentence)
+- 2-3 sentences with Arabic service name + English translation, exact QAR amounts, revenue calculation
+- Risk assessment: "Demand elasticity: <5%" or "Political sensitivity: Medium"
+- Action step: "RECOMMENDED ACTION: [specific next step with phase timing]"
+
+**KEEP IT CONCISE:** 
+- Executive summary: 4 bullets max
+- Each detailed insight: 4-5 sentences max
+- Total response: ~600-800 words"""
+
 # Insight generation prompts
 INSIGHT_PROMPTS = {
     "executive_summary": """As a Senior Revenue Strategy Consultant for Qatar's Ministry of Labour, analyze this comprehensive service portfolio data:
 
 PORTFOLIO OVERVIEW:
 - Total Services: {total_services}
-- Total Annual Requests: {total_requests:,}
+- Total Annual Requests: {total_requests:.0f}
 - Services Without Fees: {services_without_fees} ({no_fee_pct:.1f}%)
-- Current Annual Revenue: {current_revenue:,.0f} QAR
-- Top Service by Volume: {top_service} ({top_requests:,} requests)
+- Current Annual Revenue: {current_revenue:.0f} QAR
+- Top Service by Volume: {top_service} ({top_requests:.0f} requests)
 
 CRITICAL CONTEXT - DOCUMENTED SUGGESTIONS:
 The operations team has provided specific, documented fee recommendations for 18+ services (33% of portfolio) with estimated untapped revenue of 83+ million QAR. These suggestions include:
@@ -178,37 +185,14 @@ TOP 10 SERVICES BY REQUEST VOLUME:
 {top_10_services}
 
 YOUR TASK:
-Generate 4-6 strategic insights in this EXACT format:
-
-**STRUCTURE:**
 1. Start with 3-4 bullet "Executive Summary" of key findings (one line each)
-2. Then provide 4-6 detailed insights
-
-**EACH INSIGHT MUST:**
-
-1. **Reference ACTUAL documented suggestions** - Cite specific Arabic text and exact QAR amounts from operational data
-2. **Prioritize by revenue impact** - Lead with highest-impact documented opportunities
-3. **Assess implementation feasibility** - Distinguish employer-paid (low risk) vs employee-paid (politically sensitive)
-4. **Recognize fee structure sophistication** - Note conditional pricing (gov't vs private), tiered rates, per-person/per-month structures
-5. **Include assumption caveats** - When assuming durations or elasticity, explicitly state: "(Assumes X-month average duration - verify with historical data)" or "(Estimated Y% demand drop - monitor in pilot phase)"
-6. **Use RELATIVE timeframes** - Say "Phase 1 (Months 1-3)", "Phase 2 (Months 4-6)", "Phase 3 (Months 7-12)" instead of specific quarters/years
+2. Then provide 4-6 detailed insights in this EXACT format
 
-**FORMAT FOR EACH INSIGHT:**
-- Bold insight header (one sentence)
-- 2-3 sentences with Arabic service name + English translation, exact QAR amounts, revenue calculation
-- Risk assessment: "Demand elasticity: <5%" or "Political sensitivity: Medium"
-- Action step: "RECOMMENDED ACTION: [specific next step with phase timing]"
-
-**KEEP IT CONCISE:** 
-- Executive summary: 4 bullets max
-- Each detailed insight: 4-5 sentences max
-- Total response: ~600-800 words
+""" + INSIGHT_REQUIREMENTS + """
 
 **CRITICAL: ACCURACY CHECK**
-- If you state a number ("three services", "four opportunities", "two main risks"), VERIFY you actually list that exact count
-- Example: "three services (A, B, C)" - count 1, 2, 3 - must match
-- If listing items in parentheses, count them before stating the number
-- Better to say "multiple services" than to miscount
+- If you state a count ("three services (A, B, C)"), count the items you list - they must match
+- If unsure, say "multiple services" rather than miscount
 
 THINK LIKE: A consultant presenting slide deck to the Minister - start with executive summary, then supporting details.""",
 
@@ -217,11 +201,7 @@ THINK LIKE: A consultant presenting slide deck to the Minister - start with exec
 DOCUMENTED OPPORTUNITIES WITH ACTUAL SUGGESTIONS:
 {opportunities_data}
 
-CONTEXT: These are NOT hypothetical scenarios. These are REAL fee suggestions documented by the operations team in Arabic, including:
-- Specific QAR amounts (e.g., "مئة ريال" = 100 QAR, "عشرة ريال" = 10 QAR)
-- Fee structures (per-person "عن كل شخص", per-month "عن كل شهر", conditional "في حال")
-- Special conditions (government vs private company pricing)
-- Historical context where fees were previously changed
+CONTEXT: These are REAL suggestions from the operations team, not hypotheticals. Arabic terms: "مئة ريال" = 100 QAR, "عشرة ريال" = 10 QAR, per-person "عن كل شخص", per-month "عن كل شهر", conditional "في حال".
 
 CRITICAL ANALYSIS FRAMEWORK:
 
@@ -242,20 +222,16 @@ CRITICAL ANALYSIS FRAMEWORK:
    - Tiered pricing (specialized vs non-specialized professions) reflects cost-to-serve differences
 
 YOUR TASK:
-Generate strategic insights in this format:
-
-**STRUCTURE:**
 1. Start with 3-4 bullet executive summary highlighting top opportunities and total potential
-2. Then provide 4-5 detailed insights
+2. Then provide 4-5 detailed insights in this format
 
 **EACH INSIGHT MUST:**
 
 1. **Validate documented suggestions** - Reference specific Arabic text and explain why the suggested QAR amount is appropriate or needs adjustment
-2. **Rank implementation sequence** - State which phase (Months 1-3, 4-6, 7-12) and why
+2. **Rank implementation sequence** - State which phase and why, as relative timeframes: Phases 1-3 (Months 1-3, 4-6, 7-12), not dates
 3. **Include assumption caveats** - State any assumptions: "(Assumes X% demand elasticity - pilot test recommended)" or "(Assumes Y-month average - verify with operational data)"
 4. **Assess specific risks** - State exact risk levels: "Demand elasticity: <5%" or "Political sensitivity: High (worker-paid fee)"
-5. **Use relative timeframes** - "Phase 1 (Months 1-3): [action]" instead of specific dates
-6. **Provide tactical milestones** - "Months 1-2: Stakeholder consultation. Months 3-4: System configuration. Month 5: Launch."
+5. **Provide tactical milestones** - "Months 1-2: Stakeholder consultation. Months 3-4: System configuration. Month 5: Launch."
 
 **FORMAT:**
 - **Bold one-sentence insight header**
@@ -273,12 +249,10 @@ Generate strategic insights in this format:
 When projecting revenue for recurring fees (per-month, per-year), include caveat: "(Projected based on X-period average - actual revenue depends on duration patterns)"
 
 **CRITICAL: ACCURACY CHECK**
-- If you state a number ("three services", "five priorities"), COUNT the items you actually list
-- Example: "the two main services (A, B)" - verify you list exactly 2, not 1 or 3
-- When listing items in parentheses, count them: (Item1, Item2, Item3) = THREE items
-- If unsure of exact count, use "several" or "multiple" instead of a specific number
+- If you state a count ("the two main services (A, B)"), count the items you list - they must match
+- If unsure, say "several" or "multiple" rather than miscount
 
-Total Documented Potential: {total_potential:,.0f} QAR
+Total Documented Potential: {total_potential:.0f} QAR
 
 THINK LIKE: Consultant validating operational team's proposals with expert analysis and phased implementation roadmap.""",
 
@@ -288,8 +262,8 @@ Service: {service_name}
 Category: {category}
 Current Fee: {current_fee} QAR
 New Fee: {new_fee} QAR
-Total Requests: {requests:,}
-Revenue Impact: {revenue_increase:,.0f} QAR
+Total Requests: {requests:.0f}
+Revenue Impact: {revenue_increase:.0f} QAR
 
 Provide quick AI feedback:
 1. Is this fee reasonable? (Compare to service value)
@@ -348,6 +322,40 @@ Structure the report with:
 Use professional language, specific numbers, and be actionable."""
 }
 
+# Output shape for intent_parsing, enforced by the API's structured output
+# (strict JSON schema), so the prompts no longer describe it
+_NULLABLE_NUMBER = {"type": ["number", "null"]}
+INTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent_type": {"type": "string", "enum": ["add_fee", "increase_revenue", "category_pricing", "custom"]},
+        "services": {"type": "array", "items": {"type": "string"}, "description": "Service names"},
+        "categories": {"type": "array", "items": {"type": "string"}},
+        "fee_amount": _NULLABLE_NUMBER,
+        "constraints": {
+            "type": "object",
+            "properties": {
+                "max_fee": _NULLABLE_NUMBER,
+                "target_revenue": _NULLABLE_NUMBER,
+                "percentage_increase": _NULLABLE_NUMBER
+            },
+            "required": ["max_fee", "target_revenue", "percentage_increase"],
+            "additionalProperties": False
+        },
+        "confidence": {"type": "number", "description": "From 0 to 1"}
+    },
+    "required": ["intent_type", "services", "categories", "fee_amount", "constraints", "confidence"],
+    "additionalProperties": False
+}
+
+# Same for bulk_intent_parsing: one intent per request, in order
+BULK_INTENT_SCHEMA = {
+    "type": "object",
+    "properties": {"results": {"type": "array", "items": INTENT_SCHEMA}},
+    "required": ["results"],
+    "additionalProperties": False
+}
+
 # Conversational scenario building
 SCENARIO_BUILDING_PROMPTS = {
     "intent_parsing": """Parse this user request into a structured scenario:
@@ -357,20 +365,17 @@ User Request: "{user_input}"
 Available services: {service_list}
 Available categories: {category_list}
 
-Extract and return JSON:
-{{
-  "intent_type": "add_fee" | "increase_revenue" | "category_pricing" | "custom",
-  "services": ["list of service names"],
-  "categories": ["list of categories"],
-  "fee_amount": number or null,
-  "constraints": {{
-    "max_fee": number or null,
-    "target_revenue": number or null,
-    "percentage_increase": number or null
-  }},
-  "confidence": 0-1
-}}
+Be precise with service name matching (Arabic names included).""",
+
+    "bulk_intent_parsing": """Parse each of the following {count} user requests into a structured scenario:
 
+User Requests:
+{user_inputs}
+
+Available services: {service_list}
+Available categories: {category_list}
+
+Return exactly {count} results, in the same order as the requests.
 Be precise with service name matching (Arabic names included).""",
 
     "scenario_confirmation": """The user requested: "{user_input}"
@@ -378,8 +383,169 @@ Be precise with service name matching (Arabic names included).""",
 I interpreted this as:
 - Services: {services}
 - Fee: {fee} QAR
-- Expected Revenue Increase: {revenue_increase:,.0f} QAR
+- Expected Revenue Increase: {revenue_increase:.0f} QAR
 
 Is this correct? Generate a natural language confirmation message."""
 }
 
+
+
+def _field_formatter(field: str, spec: str, conversion: Optional[str]) -> Callable[[Mapping[str, Any]], str]:
+    """Formatter for one {field!conversion:spec} placeholder, specialised once."""
+    if conversion == "r":
+        return lambda values: format(repr(values[field]), spec)
+    if conversion:
+        return lambda values: format(str(values[field]), spec)
+    return lambda values: format(values[field], spec)
+
+
+def _placeholder(field: str, spec: str, conversion: Optional[str]) -> str:
+    """Source text of a placeholder, e.g. "{current_revenue:.0f}"."""
+    return "{" + field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}"
+
+
+@lru_cache(maxsize=None)
+def compile_template(template: str) -> Callable[..., str]:
+    """
+    Compile a str.format template into a render function.
+    
+    The format string is split once here into literal fragments, each
+    followed by a formatter for its field; render(values) only looks up
+    and formats the values. It returns the same text as
+    template.format(**values), including format specs and escaped
+    braces. A missing field raises KeyError, like str.format, unless
+    render is called with safe=True: then the placeholder is left in
+    the text as written, like string.Template.safe_substitute.
+    
+    Args:
+        template: Template with plain {field} / {field:spec} placeholders
+        
+    Returns:
+        Function taking a mapping of field values and an optional safe flag
+    """
+    parts = tuple(
+        (literal, None, None, None) if field is None
+        else (literal, field, _field_formatter(field, spec, conversion), _placeholder(field, spec, conversion))
+        for literal, field, spec, conversion in string.Formatter().parse(template)
+    )
+    
+    def render(values: Mapping[str, Any], safe: bool = False) -> str:
+        if safe:
+            return "".join([
+                literal if field is None
+                else literal + (formatter(values) if field in values else placeholder)
+                for literal, field, formatter, placeholder in parts
+            ])
+        return "".join([
+            literal if formatter is None else literal + formatter(values)
+            for literal, _, formatter, _ in parts
+        ])
+    
+    render.template = template
+    return render
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only view of nested prompt dicts; lists become tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+# The prompts are shared by every session, so they are exposed read-only;
+# an accidental write would otherwise change them for all users
+SYSTEM_PROMPTS = _freeze(SYSTEM_PROMPTS)
+LANG_SUFFIX = _freeze(LANG_SUFFIX)
+CONTEXT_TEMPLATES = _freeze(CONTEXT_TEMPLATES)
+EXAMPLE_QUESTIONS = _freeze(EXAMPLE_QUESTIONS)
+INSIGHT_PROMPTS = _freeze(INSIGHT_PROMPTS)
+REPORT_PROMPTS = _freeze(REPORT_PROMPTS)
+SCENARIO_BUILDING_PROMPTS = _freeze(SCENARIO_BUILDING_PROMPTS)
+
+# Every static prompt by path, e.g. ("system", "en", "insights") or
+# ("insight", "opportunities"); one lookup instead of two or three
+PROMPTS = MappingProxyType({
+    **{("system", lang, kind): text
+       for lang, prompts in SYSTEM_PROMPTS.items() for kind, text in prompts.items()},
+    **{("context", name): text for name, text in CONTEXT_TEMPLATES.items()},
+    **{("insight", name): text for name, text in INSIGHT_PROMPTS.items()},
+    **{("report", name): text for name, text in REPORT_PROMPTS.items()},
+    **{("scenario", name): text for name, text in SCENARIO_BUILDING_PROMPTS.items()},
+})
+
+
+# Prompts the assistant renders directly, as plain module constants
+EXECUTIVE_REPORT_PROMPT: Final[str] = REPORT_PROMPTS["executive_report"]
+INTENT_PARSING_PROMPT: Final[str] = SCENARIO_BUILDING_PROMPTS["intent_parsing"]
+BULK_INTENT_PARSING_PROMPT: Final[str] = SCENARIO_BUILDING_PROMPTS["bulk_intent_parsing"]
+
+
+def get_prompt(*path: str) -> str:
+    """
+    Look up a static prompt by its path in PROMPTS.
+    
+    Example:
+        get_prompt("system", "ar", "chat")
+    """
+    return PROMPTS[path]
+
+
+@lru_cache(maxsize=None)
+def get_prompt_tokens(path: Tuple[str, ...], model: str = "gpt-4") -> Optional[Tuple[int, ...]]:
+    """
+    Token ids of a static prompt, encoded once per (path, model).
+    
+    tiktoken is imported on first use, so this module still imports
+    without it.
+    
+    Args:
+        path: Prompt path in PROMPTS, e.g. ("system", "en", "insights")
+        model: Model whose tokenizer to use
+        
+    Returns:
+        Token ids, or None when tiktoken or its tables are unavailable
+    """
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception:
+        return None
+    return tuple(encoding.encode_ordinary(PROMPTS[path]))
+
+
+def render_context(name: str, context: Mapping[str, Any]) -> str:
+    """
+    Fill a CONTEXT_TEMPLATES entry with dashboard values.
+    
+    Context is best-effort, so fields the caller does not have are left
+    as placeholders instead of raising; only the values the template
+    uses need computing.
+    
+    Example:
+        render_context("service_context", {"service_name": ..., ...})
+    """
+    return compile_template(CONTEXT_TEMPLATES[name])(context, safe=True)
+
+
+def fmt_top_services(rows: Iterable[Mapping[str, Any]]) -> str:
+    """
+    Render service rows (name, requests, fee) as the top-services block.
+    
+    Use this rather than concatenating rows by hand; the row template is
+    compiled once and the lines are joined in one pass.
+    """
+    render = compile_template(TOP_SERVICE_ROW)
+    return "\n".join([render(row) for row in rows])
+
+
+def example_question(language: str, turn: int) -> str:
+    """
+    Example question to show on a given turn, rotating through the list.
+    
+    Stateless, so each session keeps its own counter (e.g. in
+    st.session_state) instead of sharing an iterator across users.
+    """
+    questions = EXAMPLE_QUESTIONS.get(language, EXAMPLE_QUESTIONS["en"])
+    return questions[turn % len(questions)]
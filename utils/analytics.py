@@ -6,6 +6,42 @@ import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
 from sklearn.linear_model import LinearRegression
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function as plain Python."""
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def _revenue_impact_kernel(
+    total_requests: float,
+    current_fee: float,
+    new_fee: float,
+    elasticity: float
+) -> Tuple[float, float, float]:
+    """
+    Scalar core of calculate_revenue_impact, compiled when numba is available.
+    
+    Returns:
+        tuple: (adjusted_requests, current_revenue, new_revenue)
+    """
+    # If elasticity = -0.1, a 100% price increase causes 10% demand decrease
+    if current_fee > 0:
+        price_change_pct = (new_fee - current_fee) / current_fee
+    elif new_fee > 0:
+        price_change_pct = 1.0
+    else:
+        price_change_pct = 0.0
+    
+    adjusted_requests = total_requests * (1 + elasticity * price_change_pct)
+    adjusted_requests = max(0.0, adjusted_requests)  # Cannot be negative
+    
+    return adjusted_requests, total_requests * current_fee, adjusted_requests * new_fee
+
 
 def calculate_revenue_impact(
     df: pd.DataFrame, 
@@ -27,23 +63,13 @@ def calculate_revenue_impact(
     """
     service_data = df[df['اسم الخدمة'] == service_name].iloc[0]
     
-    # Calculate demand adjustment based on elasticity
-    # If elasticity = -0.1, a 100% price increase causes 10% demand decrease
     current_fee = service_data['Current_Fee_Numeric']
     total_requests = service_data['اجمالي العدد']
     
-    if current_fee > 0:
-        price_change_pct = ((new_fee - current_fee) / current_fee)
-    else:
-        price_change_pct = 1.0 if new_fee > 0 else 0.0
-    
-    demand_change_pct = elasticity * price_change_pct
-    adjusted_requests = total_requests * (1 + demand_change_pct)
-    adjusted_requests = max(0, adjusted_requests)  # Cannot be negative
-    
-    # Calculate revenues
-    current_revenue = total_requests * current_fee
-    new_revenue = adjusted_requests * new_fee
+    # Demand adjustment based on elasticity, then current and new revenue
+    adjusted_requests, current_revenue, new_revenue = _revenue_impact_kernel(
+        float(total_requests), float(current_fee), float(new_fee), float(elasticity)
+    )
     revenue_increase = new_revenue - current_revenue
     
     return {
@@ -155,7 +181,7 @@ def calculate_category_performance(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Category performance metrics.
     """
-    category_stats = df.groupby('Category').agg({
+    category_stats = df.groupby('Category', observed=True).agg({
         'اسم الخدمة': 'count',
         'اجمالي العدد': 'sum',
         'Current_Annual_Revenue': 'sum',
@@ -200,19 +226,25 @@ def calculate_scenario_comparison(
     """
     results = []
     
+    names = df['اسم الخدمة']
+    requests = df['اجمالي العدد'].to_numpy(dtype=float)
+    current_revenue = df['Current_Annual_Revenue'].to_numpy(dtype=float)
+    # A new fee applies once per service name, as calculate_revenue_impact
+    # uses the first matching row
+    first_row = ~names.duplicated().to_numpy()
+    
     for scenario_name, fee_config in scenarios.items():
-        total_revenue = 0
-        services_affected = 0
-        
-        for service_name, new_fee in fee_config.items():
-            if service_name in df['اسم الخدمة'].values:
-                impact = calculate_revenue_impact(df, service_name, new_fee)
-                total_revenue += impact['new_revenue']
-                services_affected += 1
+        # One pass over the services per scenario: configured rows get
+        # requests x new fee, the rest keep their current revenue
+        in_scenario = names.isin(fee_config.keys()).to_numpy()
+        modified = in_scenario & first_row
+        new_fees = names.map(fee_config).to_numpy(dtype=float)
         
-        # Add revenue from services not in the scenario (keep current fees)
-        unaffected_services = df[~df['اسم الخدمة'].isin(fee_config.keys())]
-        total_revenue += unaffected_services['Current_Annual_Revenue'].sum()
+        total_revenue = (
+            (requests[modified] * new_fees[modified]).sum()
+            + current_revenue[~in_scenario].sum()
+        )
+        services_affected = int(modified.sum())
         
         results.append({
             'Scenario': scenario_name,
@@ -312,13 +344,16 @@ def analyze_suggested_fees(df: pd.DataFrame) -> Dict[str, Any]:
         dict: Analysis results including totals, breakdowns, and opportunities.
     """
     # Filter services with suggestions
-    has_suggestions = df[df['Suggested_Fee_Numeric'] > 0].copy()
+    has_suggestions = df[df['Suggested_Fee_Numeric'] > 0]
     
-    # Calculate totals
+    # Totals and averages in one aggregation pass
+    stats = has_suggestions[[
+        'Suggested_Revenue_Potential', 'Current_Annual_Revenue', 'Revenue_Gap', 'Suggested_Fee_Numeric'
+    ]].agg(['sum', 'mean'])
     total_services_with_suggestions = len(has_suggestions)
-    total_potential_revenue = has_suggestions['Suggested_Revenue_Potential'].sum()
-    total_current_revenue = has_suggestions['Current_Annual_Revenue'].sum()
-    total_revenue_gap = has_suggestions['Revenue_Gap'].sum()
+    total_potential_revenue = stats.at['sum', 'Suggested_Revenue_Potential']
+    total_current_revenue = stats.at['sum', 'Current_Annual_Revenue']
+    total_revenue_gap = stats.at['sum', 'Revenue_Gap']
     
     # Breakdown by fee structure type
     fee_type_breakdown = has_suggestions.groupby('Fee_Structure_Type').agg({
@@ -328,19 +363,22 @@ def analyze_suggested_fees(df: pd.DataFrame) -> Dict[str, Any]:
     }).reset_index()
     fee_type_breakdown.columns = ['Fee_Type', 'Service_Count', 'Potential_Revenue', 'Total_Requests']
     
-    # Services without fees but with suggestions (quick wins)
-    quick_wins = has_suggestions[has_suggestions['Current_Fee_Numeric'] == 0].copy()
-    quick_wins_count = len(quick_wins)
-    quick_wins_potential = quick_wins['Suggested_Revenue_Potential'].sum()
+    # Quick wins (no current fee) and high confidence suggestions as masks
+    # over the same arrays, so no intermediate frames are built
+    potential = has_suggestions['Suggested_Revenue_Potential'].to_numpy(dtype=float)
+    revenue_gap = has_suggestions['Revenue_Gap'].to_numpy(dtype=float)
+    is_quick_win = (has_suggestions['Current_Fee_Numeric'] == 0).to_numpy()
+    is_high_confidence = (has_suggestions['Fee_Suggestion_Confidence'] >= 0.8).to_numpy()
     
-    # High confidence suggestions
-    high_confidence = has_suggestions[has_suggestions['Fee_Suggestion_Confidence'] >= 0.8]
-    high_confidence_count = len(high_confidence)
-    high_confidence_potential = high_confidence['Revenue_Gap'].sum()
+    quick_wins_count = int(is_quick_win.sum())
+    quick_wins_potential = potential @ is_quick_win
+    
+    high_confidence_count = int(is_high_confidence.sum())
+    high_confidence_potential = revenue_gap @ is_high_confidence
     
     # Average metrics
-    avg_suggested_fee = has_suggestions['Suggested_Fee_Numeric'].mean()
-    avg_revenue_gain = has_suggestions['Revenue_Gap'].mean()
+    avg_suggested_fee = stats.at['mean', 'Suggested_Fee_Numeric']
+    avg_revenue_gain = stats.at['mean', 'Revenue_Gap']
     
     return {
         'total_services_with_suggestions': total_services_with_suggestions,
@@ -381,10 +419,11 @@ def identify_quick_wins(
         (df['Suggested_Fee_Numeric'] > 0) &
         (df['Current_Fee_Numeric'] <= 20) &
         (df['اجمالي العدد'] >= min_requests)
-    ].copy()
+    ]
     
-    # Sort by revenue gap (potential gain)
-    quick_wins = quick_wins.sort_values('Revenue_Gap', ascending=False)
+    # Top services by revenue gap (potential gain); nlargest selects them
+    # without sorting every candidate
+    quick_wins = quick_wins.nlargest(top_n, 'Revenue_Gap')
     
     # Select relevant columns
     result = quick_wins[[
@@ -399,7 +438,7 @@ def identify_quick_wins(
         'Fee_Suggestion_Confidence',
         'Special_Conditions',
         'ملاحظات و مقترح الرسوم'
-    ]].head(top_n)
+    ]]
     
     return result
 
@@ -0,0 +1,60 @@
+"""
+Shared API clients for the API check scripts.
+
+Each factory builds its client once per process (and per API key), so
+repeated probes reuse the same connection pool and .env is read once.
+SDKs are imported on first use, so a missing package only affects the
+provider that needs it.
+"""
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """Load .env into the environment once per process."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+@lru_cache(maxsize=None)
+def get_anthropic_client(api_key: Optional[str] = None):
+    """
+    Shared Anthropic client.
+
+    Args:
+        api_key: API key; defaults to ANTHROPIC_API_KEY from the environment/.env.
+
+    Returns:
+        anthropic.Anthropic: Client reused by every caller with the same key.
+    """
+    from anthropic import Anthropic
+
+    load_env()
+    return Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+
+
+@lru_cache(maxsize=None)
+def get_openai_client(api_key: Optional[str] = None):
+    """
+    Shared OpenAI client.
+
+    Args:
+        api_key: API key; defaults to OPENAI_API_KEY from the environment/.env.
+
+    Returns:
+        openai.OpenAI: Client reused by every caller with the same key.
+    """
+    from openai import OpenAI
+
+    load_env()
+    return OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+
+
+@lru_cache(maxsize=1)
+def get_http_session():
+    """Shared requests.Session for plain HTTP APIs such as OpenRouter."""
+    import requests
+
+    return requests.Session()
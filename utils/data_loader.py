@@ -1,12 +1,47 @@
 """
 Data loading and preprocessing module for Ministry of Labour services data.
 """
+import os
 import pandas as pd
 import numpy as np
 import re
 from typing import Tuple, Dict, Any, Optional
 
 
+# Arrow-backed strings keep text columns in one contiguous UTF-8 buffer
+# instead of a Python object per row. NaN stays the missing value, as with
+# pandas 3's default string dtype; older pandas or a missing pyarrow keep
+# plain object columns.
+try:
+    TEXT_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+except (ImportError, TypeError):
+    TEXT_DTYPE = None
+
+TEXT_COLUMNS = [
+    'ملاحظات و مقترح الرسوم', 'Fee_Structure_Type', 'Fee_Conditions',
+    'Historical_Change_Date', 'Special_Conditions'
+]
+
+# Arabic number words mapping (values are the digits they are replaced with)
+ARABIC_NUMBERS = {
+    'واحد': '1', 'اثنين': '2', 'اثنان': '2', 'ثلاثة': '3', 'ثلاث': '3',
+    'أربعة': '4', 'أربع': '4', 'خمسة': '5', 'خمس': '5',
+    'ستة': '6', 'سبعة': '7', 'ثمانية': '8', 'تسعة': '9',
+    'عشرة': '10', 'عشر': '10', 'عشرون': '20', 'ثلاثون': '30',
+    'أربعون': '40', 'خمسون': '50', 'ستون': '60', 'سبعون': '70',
+    'ثمانون': '80', 'تسعون': '90', 'مئة': '100', 'مائة': '100',
+    'ألف': '1000', 'الف': '1000'
+}
+
+# Patterns are compiled once at import instead of on every parsed row.
+# The number words are matched in mapping order, so a word that begins a
+# longer one (e.g. عشر in عشرون) is replaced the same way as a word-by-word
+# str.replace over the mapping would.
+ARABIC_NUMBER_PATTERN = re.compile('|'.join(map(re.escape, ARABIC_NUMBERS)))
+NUMBER_PATTERN = re.compile(r'\d+')
+MONTH_PATTERN = re.compile(r'شهر\s*(\d+)')
+
+
 def load_services_data(file_path: str = "Book1.xlsx") -> pd.DataFrame:
     """
     Load and preprocess the Ministry of Labour services data from Excel.
@@ -105,24 +140,11 @@ def parse_suggested_fee(notes_text: str) -> Dict[str, Any]:
         'raw_text': text
     }
     
-    # Arabic number words mapping
-    arabic_numbers = {
-        'واحد': 1, 'اثنين': 2, 'اثنان': 2, 'ثلاثة': 3, 'ثلاث': 3,
-        'أربعة': 4, 'أربع': 4, 'خمسة': 5, 'خمس': 5,
-        'ستة': 6, 'سبعة': 7, 'ثمانية': 8, 'تسعة': 9,
-        'عشرة': 10, 'عشر': 10, 'عشرون': 20, 'ثلاثون': 30,
-        'أربعون': 40, 'خمسون': 50, 'ستون': 60, 'سبعون': 70,
-        'ثمانون': 80, 'تسعون': 90, 'مئة': 100, 'مائة': 100,
-        'ألف': 1000, 'الف': 1000
-    }
-    
     # Replace Arabic number words with digits
-    text_normalized = text
-    for word, num in arabic_numbers.items():
-        text_normalized = text_normalized.replace(word, str(num))
+    text_normalized = ARABIC_NUMBER_PATTERN.sub(lambda m: ARABIC_NUMBERS[m.group()], text)
     
     # Extract all numbers from text
-    numbers = re.findall(r'\d+', text_normalized)
+    numbers = NUMBER_PATTERN.findall(text_normalized)
     numbers = [int(n) for n in numbers]
     
     # Determine fee structure type and extract fees
@@ -184,6 +206,76 @@ def parse_suggested_fee(notes_text: str) -> Dict[str, Any]:
     return result
 
 
+def parse_suggested_fees(notes: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized parse_suggested_fee over a whole notes column.
+    
+    Applies the same rules with pandas string methods and np.select, so the
+    column is scanned a few times in C instead of once per row in Python.
+    
+    Args:
+        notes (pd.Series): Notes/suggestions column.
+        
+    Returns:
+        pd.DataFrame: One row per note (same index) with columns base_fee,
+            unit_type, secondary_fee, conditions and confidence, matching
+            parse_suggested_fee's keys.
+    """
+    text = notes.astype(str).str.strip()
+    empty = (notes.isna() | (text == '')).to_numpy()
+    
+    # First and second numbers after replacing number words with digits
+    normalized = text.str.replace(
+        ARABIC_NUMBER_PATTERN, lambda m: ARABIC_NUMBERS[m.group()], regex=True
+    )
+    numbers = normalized.str.extract(r'^\D*(\d+)(?:\D+(\d+))?').astype(float)
+    first = numbers[0].to_numpy()
+    second = numbers[1].to_numpy()
+    has_number = ~np.isnan(first)
+    first = np.nan_to_num(first)
+    
+    # Same precedence as the if/elif chain in parse_suggested_fee
+    is_per_person = text.str.contains('لكل شخص|عن كل شخص').to_numpy()
+    is_per_month = text.str.contains('لكل شهر|عن كل شهر').to_numpy()
+    is_per_modification = text.str.contains('لكل تعديل|عن كل تعديل').to_numpy()
+    is_tiered = text.str.contains('لكل مهنة', regex=False).to_numpy()
+    is_conditional = text.str.contains('حال', regex=False).to_numpy()
+    unit_conditions = [empty, is_per_person, is_per_month, is_per_modification, is_tiered, is_conditional]
+    
+    unit_type = np.select(
+        unit_conditions,
+        ['none', 'per_person', 'per_month', 'per_modification', 'tiered', 'conditional'],
+        default='flat'
+    )
+    confidence = np.select(
+        unit_conditions,
+        [0.0, 0.9, 0.9, 0.9, 0.85, 0.8],
+        default=np.where(has_number, 0.7, 0.0)
+    )
+    base_fee = np.where(empty, 0.0, first)
+    confidence = np.where(base_fee > 10000, confidence * 0.5, confidence)
+    secondary_fee = np.where(unit_type == 'tiered', np.nan_to_num(second), 0.0)
+    
+    conditions = np.select(
+        [
+            text.str.contains('شركة خاصة', regex=False).to_numpy(),
+            text.str.contains('فصل تأديبي|التأديبي').to_numpy(),
+            text.str.contains('حكومية', regex=False).to_numpy()
+        ],
+        ['private_company_only', 'disciplinary_termination', 'government_entities'],
+        default=''
+    )
+    conditions = np.where(unit_type == 'conditional', conditions, '')
+    
+    return pd.DataFrame({
+        'base_fee': base_fee,
+        'unit_type': unit_type,
+        'secondary_fee': secondary_fee,
+        'conditions': conditions,
+        'confidence': confidence
+    }, index=notes.index)
+
+
 def extract_historical_fee_changes(notes_text: str) -> Dict[str, Any]:
     """
     Parse historical fee change information from notes.
@@ -222,14 +314,14 @@ def extract_historical_fee_changes(notes_text: str) -> Dict[str, Any]:
         result['has_change'] = True
         
         # Extract numbers
-        numbers = re.findall(r'\d+', text)
+        numbers = NUMBER_PATTERN.findall(text)
         if len(numbers) >= 2:
             result['original_fee'] = float(numbers[0])
             result['new_fee'] = float(numbers[1])
         
         # Extract date if mentioned
         if 'شهر' in text:
-            month_match = re.search(r'شهر\s*(\d+)', text)
+            month_match = MONTH_PATTERN.search(text)
             if month_match:
                 result['change_date'] = f"Month {month_match.group(1)}"
     
@@ -237,7 +329,7 @@ def extract_historical_fee_changes(notes_text: str) -> Dict[str, Any]:
         result['has_change'] = True
         result['change_description'] = 'Fee cancelled'
         # Extract original fee if mentioned
-        numbers = re.findall(r'\d+', text)
+        numbers = NUMBER_PATTERN.findall(text)
         if numbers:
             result['original_fee'] = float(numbers[0])
             result['new_fee'] = 0.0
@@ -377,13 +469,13 @@ def add_calculated_fields(df: pd.DataFrame) -> pd.DataFrame:
     # Parse suggested fees from notes column
     notes_column = 'ملاحظات و مقترح الرسوم'
     if notes_column in df_copy.columns:
-        parsed_fees = df_copy[notes_column].apply(parse_suggested_fee)
+        parsed_fees = parse_suggested_fees(df_copy[notes_column])
         
-        df_copy['Suggested_Fee_Numeric'] = parsed_fees.apply(lambda x: x['base_fee'])
-        df_copy['Suggested_Fee_Secondary'] = parsed_fees.apply(lambda x: x['secondary_fee'])
-        df_copy['Fee_Structure_Type'] = parsed_fees.apply(lambda x: x['unit_type'])
-        df_copy['Fee_Suggestion_Confidence'] = parsed_fees.apply(lambda x: x['confidence'])
-        df_copy['Fee_Conditions'] = parsed_fees.apply(lambda x: x['conditions'])
+        df_copy['Suggested_Fee_Numeric'] = parsed_fees['base_fee']
+        df_copy['Suggested_Fee_Secondary'] = parsed_fees['secondary_fee']
+        df_copy['Fee_Structure_Type'] = parsed_fees['unit_type']
+        df_copy['Fee_Suggestion_Confidence'] = parsed_fees['confidence']
+        df_copy['Fee_Conditions'] = parsed_fees['conditions']
         
         # Calculate suggested revenue potential (use base fee for estimates)
         df_copy['Suggested_Revenue_Potential'] = (
@@ -444,6 +536,18 @@ def get_data_summary(df: pd.DataFrame) -> Dict[str, Any]:
         'total_requests_2025': int(df[2025].sum()),
     }
     
+    # Portfolio growth metrics depend only on the request history, so they
+    # are computed once here rather than on every page render
+    total_2023 = int(df[2023].sum())
+    growth_rates = df['Growth_Rate_2023_2024'].to_numpy(dtype=np.float64)
+    summary['growth_2024'] = (
+        (summary['total_requests_2024'] - total_2023) / total_2023 * 100 if total_2023 else 0.0
+    )
+    # Mean of the services that changed, straight on the array (NaN skipped)
+    changed = growth_rates[(growth_rates != 0) & ~np.isnan(growth_rates)]
+    summary['avg_growth'] = float(changed.mean()) if changed.size else float('nan')
+    summary['services_growing'] = int(np.count_nonzero(growth_rates > 0))
+    
     return summary
 
 
@@ -466,8 +570,119 @@ def prepare_dashboard_data(file_path: str = "Book1.xlsx") -> Tuple[pd.DataFrame,
     # Add calculated fields
     df = add_calculated_fields(df)
     
+    # Low-cardinality text columns: integer codes make groupby and equality filters cheaper
+    df['Category'] = df['Category'].astype('category')
+    df['اسم الخدمة'] = df['اسم الخدمة'].astype('category')
+    
+    if TEXT_DTYPE is not None:
+        text_columns = [col for col in TEXT_COLUMNS if col in df.columns]
+        df[text_columns] = df[text_columns].astype(TEXT_DTYPE)
+    
+    # Narrower numeric dtypes shrink what is sent to Plotly and st.dataframe;
+    # to_numeric only downcasts when every value is kept exactly. Revenue stays
+    # float64 since scenario revenues (requests x fee) exceed float32 precision.
+    for col in [2022, 2023, 2024, 2025, 'اجمالي العدد']:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    df['Current_Fee_Numeric'] = pd.to_numeric(df['Current_Fee_Numeric'], downcast='float')
+    df['Years_Active'] = pd.to_numeric(df['Years_Active'], downcast='integer')
+    # Growth rates are only shown to one decimal, so float32 is plenty; money
+    # columns feeding revenue sums keep float64
+    df['Growth_Rate_2023_2024'] = df['Growth_Rate_2023_2024'].astype(np.float32)
+    
     # Generate summary
     summary = get_data_summary(df)
     
     return df, summary
 
+
+def get_parquet_cache_path(file_path: str, cache_dir: str = ".cache") -> str:
+    """
+    Parquet cache location for a workbook, keyed by its modification time.
+    
+    Args:
+        file_path (str): Path to the Excel file.
+        cache_dir (str): Directory holding the cached Parquet files.
+        
+    Returns:
+        str: Path such as ".cache/Book1.xlsx.<mtime_ns>.parquet".
+    """
+    mtime_ns = os.stat(file_path).st_mtime_ns
+    return os.path.join(cache_dir, f"{os.path.basename(file_path)}.{mtime_ns}.parquet")
+
+
+def write_parquet_cache(df: pd.DataFrame, path: str) -> None:
+    """
+    Save a processed dataframe as zstd-compressed Parquet.
+    
+    Parquet needs string column names and single-typed columns, so the
+    integer year labels are stringified and mixed text/number columns
+    are stored as text (missing values stay missing).
+    
+    Args:
+        df (pd.DataFrame): Processed services dataframe.
+        path (str): Destination file.
+    """
+    parquet_df = df.rename(columns=str)
+    for col in parquet_df.columns[parquet_df.dtypes == object]:
+        values = parquet_df[col]
+        parquet_df[col] = values.where(values.isna(), values.astype(str))
+    parquet_df.to_parquet(path, engine='pyarrow', compression='zstd', index=False)
+
+
+def read_parquet_cache(path: str) -> pd.DataFrame:
+    """
+    Load a dataframe saved by write_parquet_cache.
+    
+    Args:
+        path (str): Cached Parquet file.
+        
+    Returns:
+        pd.DataFrame: Processed services dataframe with integer year columns.
+    """
+    df = pd.read_parquet(path, engine='pyarrow')
+    return df.rename(columns={str(year): year for year in [2022, 2023, 2024, 2025]})
+
+
+def load_dashboard_data(
+    file_path: str = "Book1.xlsx",
+    cache_dir: str = ".cache"
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    prepare_dashboard_data backed by a Parquet cache of the processed data.
+    
+    The cache file name includes the workbook's modification time, so an
+    edited workbook is parsed again and caches of older versions are removed.
+    Any cache error falls back to parsing the Excel file.
+    
+    Args:
+        file_path (str): Path to the Excel file.
+        cache_dir (str): Directory holding the cached Parquet files.
+        
+    Returns:
+        tuple: (processed_dataframe, summary_dict)
+    """
+    cache_path = get_parquet_cache_path(file_path, cache_dir)
+    
+    if os.path.exists(cache_path):
+        try:
+            df = read_parquet_cache(cache_path)
+            return df, get_data_summary(df)
+        except Exception:
+            pass  # Unreadable cache - rebuild it from Excel
+    
+    df, summary = prepare_dashboard_data(file_path)
+    
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_parquet_cache(df, cache_path)
+        
+        # Drop caches of earlier versions of the same workbook
+        prefix = f"{os.path.basename(file_path)}."
+        for name in os.listdir(cache_dir):
+            stale_path = os.path.join(cache_dir, name)
+            if name.startswith(prefix) and name.endswith('.parquet') and stale_path != cache_path:
+                os.remove(stale_path)
+    except Exception:
+        pass  # Parquet support (pyarrow) is optional
+    
+    return df, summary
@@ -5,6 +5,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Any
 
+from .data_loader import get_data_summary
+
 
 class RevenueSimulator:
     """
@@ -20,6 +22,9 @@ class RevenueSimulator:
         """
         self.df = df.copy()
         self.scenarios = {}
+        # Bumped whenever a scenario is stored, so callers can cache results
+        # derived from self.scenarios
+        self.version = 0
         
     def create_scenario(
         self, 
@@ -41,19 +46,20 @@ class RevenueSimulator:
         scenario_df = self.df.copy()
         total_revenue = 0
         services_modified = []
+        fee_dtype = scenario_df['Current_Fee_Numeric'].dtype
         
         for service_name, new_fee in fee_changes.items():
             if service_name in scenario_df['اسم الخدمة'].values:
                 idx = scenario_df[scenario_df['اسم الخدمة'] == service_name].index[0]
                 
-                # Store original fee
-                original_fee = scenario_df.loc[idx, 'Current_Fee_Numeric']
+                # Store original fee (as Python numbers so narrow column dtypes can't overflow)
+                original_fee = float(scenario_df.loc[idx, 'Current_Fee_Numeric'])
                 
-                # Update fee
-                scenario_df.loc[idx, 'Current_Fee_Numeric'] = new_fee
+                # Update fee, cast to the column dtype (may be downcast to float32)
+                scenario_df.loc[idx, 'Current_Fee_Numeric'] = fee_dtype.type(new_fee)
                 
                 # Recalculate revenue
-                requests = scenario_df.loc[idx, 'اجمالي العدد']
+                requests = int(scenario_df.loc[idx, 'اجمالي العدد'])
                 scenario_df.loc[idx, 'Current_Annual_Revenue'] = requests * new_fee
                 
                 services_modified.append({
@@ -78,10 +84,13 @@ class RevenueSimulator:
             'revenue_increase': revenue_increase,
             'revenue_increase_pct': (revenue_increase / baseline_revenue * 100) if baseline_revenue > 0 else 0,
             'services_modified': services_modified,
-            'num_services_modified': len(services_modified)
+            'num_services_modified': len(services_modified),
+            # Computed once here so pages showing the scenario don't redo it per rerun
+            'summary': get_data_summary(scenario_df)
         }
         
         self.scenarios[scenario_name] = scenario
+        self.version += 1
         return scenario
     
     def apply_category_fee(
@@ -119,13 +128,48 @@ class RevenueSimulator:
         
         return self.create_scenario(scenario_name, fee_changes, description)
     
+    def compute_tiered_fees(
+        self,
+        strategies: Dict[str, Dict[str, float]]
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Compute the fee changes of several tiered strategies in one pass.
+        
+        Services without a current fee are selected once; each strategy is
+        then a single vectorized tier assignment over their request counts.
+        
+        Args:
+            strategies (dict): Strategy name -> keyword arguments of
+                apply_tiered_fee_strategy (thresholds and fees).
+            
+        Returns:
+            dict: Strategy name -> fee_changes mapping for create_scenario.
+        """
+        # Skip services that already have fees
+        no_fee_services = self.df[self.df['Current_Fee_Numeric'] <= 0]
+        service_names = no_fee_services['اسم الخدمة'].tolist()
+        requests = no_fee_services['اجمالي العدد'].to_numpy()
+        
+        fee_changes = {}
+        for name, params in strategies.items():
+            threshold = params.get('high_volume_threshold', 10000)
+            fees = np.select(
+                [requests >= threshold, requests >= threshold / 4],
+                [params.get('high_volume_fee', 50.0), params.get('medium_volume_fee', 20.0)],
+                default=params.get('low_volume_fee', 5.0)
+            )
+            fee_changes[name] = dict(zip(service_names, fees.tolist()))
+        
+        return fee_changes
+    
     def apply_tiered_fee_strategy(
         self, 
         scenario_name: str,
         high_volume_threshold: int = 10000,
         high_volume_fee: float = 50.0,
         medium_volume_fee: float = 20.0,
-        low_volume_fee: float = 5.0
+        low_volume_fee: float = 5.0,
+        fee_changes: Dict[str, float] = None
     ) -> Dict[str, Any]:
         """
         Apply tiered fees based on service volume.
@@ -136,25 +180,21 @@ class RevenueSimulator:
             high_volume_fee (float): Fee for high volume services.
             medium_volume_fee (float): Fee for medium volume services.
             low_volume_fee (float): Fee for low volume services.
+            fee_changes (dict): Fee changes already computed by
+                compute_tiered_fees for these parameters (optional).
             
         Returns:
             dict: Scenario details.
         """
-        fee_changes = {}
-        
-        for _, row in self.df.iterrows():
-            if row['Current_Fee_Numeric'] > 0:
-                continue  # Skip services that already have fees
-            
-            service_name = row['اسم الخدمة']
-            requests = row['اجمالي العدد']
-            
-            if requests >= high_volume_threshold:
-                fee_changes[service_name] = high_volume_fee
-            elif requests >= high_volume_threshold / 4:
-                fee_changes[service_name] = medium_volume_fee
-            else:
-                fee_changes[service_name] = low_volume_fee
+        if fee_changes is None:
+            fee_changes = self.compute_tiered_fees({
+                scenario_name: {
+                    'high_volume_threshold': high_volume_threshold,
+                    'high_volume_fee': high_volume_fee,
+                    'medium_volume_fee': medium_volume_fee,
+                    'low_volume_fee': low_volume_fee
+                }
+            })[scenario_name]
         
         description = (
             f"Tiered strategy: {high_volume_fee} QAR (high volume), "
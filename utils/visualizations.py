@@ -3,6 +3,7 @@ Visualization functions for the Ministry of Labour dashboard.
 """
 import plotly.graph_objects as go
 import plotly.express as px
+import numpy as np
 import pandas as pd
 from typing import List
 
@@ -45,8 +46,8 @@ def plot_revenue_trend(df: pd.DataFrame) -> go.Figure:
         plotly.graph_objects.Figure: Trend chart.
     """
     years = [2022, 2023, 2024, 2025]
-    year_totals = [df[year].sum() for year in years]
-    years = [str(y) for y in years]  # Convert to strings for display
+    year_totals = df[years].sum().to_numpy()
+    years = np.array([str(y) for y in years])  # Convert to strings for display
     
     fig = go.Figure()
     
@@ -120,7 +121,7 @@ def plot_category_distribution(df: pd.DataFrame) -> go.Figure:
     Returns:
         plotly.graph_objects.Figure: Pie chart.
     """
-    category_totals = df.groupby('Category')['اجمالي العدد'].sum().reset_index()
+    category_totals = df.groupby('Category', observed=True)['اجمالي العدد'].sum().reset_index()
     
     fig = go.Figure(go.Pie(
         labels=category_totals['Category'],
@@ -148,7 +149,7 @@ def plot_fee_status(df: pd.DataFrame) -> go.Figure:
     Returns:
         plotly.graph_objects.Figure: Stacked bar chart.
     """
-    fee_status = df.groupby(['Category', 'Has_Current_Fee']).size().unstack(fill_value=0)
+    fee_status = df.groupby(['Category', 'Has_Current_Fee'], observed=True).size().unstack(fill_value=0)
     
     fig = go.Figure()
     
@@ -280,13 +281,14 @@ def plot_pareto_chart(pareto_df: pd.DataFrame) -> go.Figure:
         plotly.graph_objects.Figure: Pareto chart.
     """
     top_20 = pareto_df.head(20)
+    ranks = np.arange(1, len(top_20) + 1)
     
     fig = go.Figure()
     
     # Bar chart for individual values
     fig.add_trace(go.Bar(
-        x=list(range(1, len(top_20) + 1)),
-        y=top_20['اجمالي العدد'],
+        x=ranks,
+        y=top_20['اجمالي العدد'].to_numpy(),
         name='Requests',
         marker=dict(color='#667eea'),
         yaxis='y'
@@ -294,8 +296,8 @@ def plot_pareto_chart(pareto_df: pd.DataFrame) -> go.Figure:
     
     # Line chart for cumulative percentage
     fig.add_trace(go.Scatter(
-        x=list(range(1, len(top_20) + 1)),
-        y=top_20['Cumulative_Pct'],
+        x=ranks,
+        y=top_20['Cumulative_Pct'].to_numpy(),
         name='Cumulative %',
         line=dict(color='#ff6b6b', width=3),
         mode='lines+markers',